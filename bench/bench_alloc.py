@@ -0,0 +1,65 @@
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from cellular_automata import load_cellular_from_file, Config, ArrayConfig, Cell, LinkedListNode
+
+def count_constructions(automaton, config, generations: int) -> dict:
+    '''
+        Counts the `Cell` and `LinkedListNode` objects created by `generations` steps, with a profile hook.
+    '''
+    counts = {'Cell': 0, 'LinkedListNode': 0}
+    codes = {Cell.__init__.__code__: 'Cell', LinkedListNode.__init__.__code__: 'LinkedListNode'}
+
+    def profile(frame, event, arg):
+        if event == 'call' and frame.f_code in codes:
+            counts[codes[frame.f_code]] += 1
+
+    sys.setprofile(profile)
+    try:
+        for _ in range(generations):
+            automaton.step(config)
+    finally:
+        sys.setprofile(None)
+    return counts
+
+def measure_memory(automaton, config, generations: int) -> tuple[int, int]:
+    '''
+        Returns the memory blocks still allocated after `generations` steps and
+        the peak of memory allocated during a step, in bytes.
+    '''
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        peak = 0
+        for _ in range(generations):
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            automaton.step(config)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    return blocks, peak
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    path = args[0] if len(args) > 0 else 'res/clignotement.cel'
+    generations = int(args[1]) if len(args) > 1 else 200
+
+    for config_type in (Config, ArrayConfig):
+        automaton, config = load_cellular_from_file(path, config_type)
+        for _ in range(generations):
+            automaton.step(config)
+        length = len(config)
+
+        counts = count_constructions(automaton, config, generations)
+        blocks, peak = measure_memory(automaton, config, generations)
+        print(f'{config_type.__name__} ({length} to {len(config)} cells, {generations} generations)')
+        for name, count in counts.items():
+            print(f'    {name} created per generation : {count / generations:.1f}')
+        print(f'    memory blocks kept per generation : {blocks / generations:.1f}')
+        print(f'    peak allocation during a generation : {peak} bytes')
@@ -0,0 +1,54 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from cellular_automata import CellularAutomaton, Config
+from parallel_engine import ParallelEngine
+
+def rule_30() -> CellularAutomaton:
+    '''
+        Elementary automaton 30 on the states Off and On, Blank behaves like Off.
+    '''
+    automaton = CellularAutomaton(('Off', 'On', 'Blank'), {}, {})
+    value = {'Off': 0, 'On': 1, 'Blank': 0}
+    for left in value:
+        for center in value:
+            for right in value:
+                bit = 30 >> (value[left] << 2 | value[center] << 1 | value[right]) & 1
+                if (left, center, right) != ('Blank', 'Blank', 'Blank'):
+                    automaton._rules.set((left, center, right), 'On' if bit else 'Off')
+    return automaton
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    width = int(args[0]) if len(args) > 0 else 1_000_000
+    generations = int(args[1]) if len(args) > 1 else 20
+
+    automaton = rule_30()
+    random.seed(0)
+
+    # Checking the engine against `CellularAutomaton.step` on a small tape
+    small = Config.from_liste([random.choice(('Off', 'On')) for _ in range(200)])
+    expected = Config.from_liste(small.states())
+    for _ in range(50):
+        automaton.step(expected)
+    assert ParallelEngine(automaton, 3).run(small, 50).states() == expected.states()
+
+    config = Config.from_liste([random.choice(('Off', 'On')) for _ in range(width)])
+    print(f'{width} cells, {generations} generations')
+    reference, base = None, None
+    workers = 1
+    while True:
+        start = time.perf_counter()
+        result = ParallelEngine(automaton, workers).run(config, generations).states()
+        elapsed = time.perf_counter() - start
+        if reference == None:
+            reference, base = result, elapsed
+        assert result == reference
+        print(f'{workers:>3} workers : {elapsed:8.3f} s   speedup x{base / elapsed:.2f}')
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(2 * workers, os.cpu_count() or 1)
@@ -0,0 +1,65 @@
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from cellular_parser import cellular_parser
+from cellular_automata import load_cellular_from_file
+
+def synthetic_source(transitions: int) -> str:
+    '''
+        Returns a .cel source with `transitions` distinct transitions on
+        generated states, in the layout written by `translate_turing_machine`.
+    '''
+    count = 2
+    while count ** 3 < transitions:
+        count += 1
+    states = [f'State{index}' for index in range(count)]
+    lines = ['Colors:']
+    lines.append(',\n'.join(f'   Color{state} <- ({index % 256}, {index * 7 % 256}, {index * 13 % 256})' for index, state in enumerate(states)))
+    lines.append('\nStates:')
+    lines.append(',\n'.join(f'   {state}(Color{state})' for state in states))
+    lines.append('\nTransitions:')
+    rules = []
+    for index in range(transitions):
+        left, center, right = index // (count * count), index // count % count, index % count
+        rules.append(f'   ({states[left]}, {states[center]}, {states[right]}) -> {states[(left + right) % count]}')
+    lines.append(',\n'.join(rules))
+    lines.append('\nInitialisation:')
+    lines.append('   ' + ', '.join(states))
+    return '\n'.join(lines) + '\n'
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    transitions = int(args[0]) if len(args) > 0 else 500_000
+
+    source = synthetic_source(transitions)
+    size = len(source.encode())
+    print(f'{transitions} transitions, {size / 1e6:.1f} MB')
+
+    start = time.perf_counter()
+    parsed = cellular_parser(source)
+    elapsed = time.perf_counter() - start
+    assert len(parsed['Transitions']) == transitions
+    print(f'parse : {elapsed:8.3f} s   {size / 1e6 / elapsed:6.1f} MB/s   {transitions / elapsed:10.0f} transitions/s')
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'synthetic.cel')
+        with open(path, 'w') as stream:
+            stream.write(source)
+        start = time.perf_counter()
+        load_cellular_from_file(path)
+        elapsed = time.perf_counter() - start
+        print(f'load  : {elapsed:8.3f} s   {transitions / elapsed:10.0f} transitions/s')
+
+        # The source is read by chunks, the peak is about the size of the rules
+        tracemalloc.start()
+        try:
+            load_cellular_from_file(path)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        print(f'load peak memory : {peak / 1e6:.1f} MB')
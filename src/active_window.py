@@ -0,0 +1,93 @@
+from cellular_automata import CellularAutomaton, Config, RuleTable, check_generations
+
+class ActiveEngine:
+    '''
+        Incremental stepping of a `CellularAutomaton` : only the cells whose
+        neighbourhood changed in the previous generation are evaluated again,
+        the other ones would keep their state anyway. A generation cost a work
+        proportional to the number of changed cells instead of the length of
+        the tape, which suits the automata made by `translate_turing_machine`
+        where only the cells around the simulated head change.
+        Unlike an `Engine`, it holds the tape between the calls, under the same
+        blank edges contract.
+    '''
+    def __init__(self, automaton: CellularAutomaton, config: Config):
+        rules = automaton._rules
+        self._names = rules.states
+        self._size = len(self._names)
+        # Only the keys of the dirty cells are looked up, no dense table is built
+        self._table = RuleTable(rules)
+        self._blank = rules.state_id('Blank')
+
+        self._cells = [rules.state_id(state) for state in config.states()]
+        self._origin = 0 # Index in `_cells` of the position 0
+        self._low, self._high = 0, len(self._cells) - 1
+        self._generation = 0
+        # At first, every cell and the two theoretical edge cells are evaluated
+        self._dirty = set(range(self._low - 1, self._high + 2))
+
+    def _get(self, position: int) -> int:
+        if position < self._low or position > self._high:
+            return self._blank
+        return self._cells[position + self._origin]
+
+    def _extend(self, position: int):
+        '''
+            Adds the edge cell `position` to the tape, making room in the buffer if needed.
+        '''
+        if position < self._low:
+            if position + self._origin < 0:
+                grow = max(len(self._cells), 16)
+                self._cells[:0] = [self._blank] * grow
+                self._origin += grow
+            self._low = position
+        else:
+            if position + self._origin == len(self._cells):
+                self._cells.extend([self._blank] * max(len(self._cells), 16))
+            self._high = position
+
+    def step(self):
+        '''
+            Applies a generation, evaluating only the dirty cells.
+        '''
+        get, table, size = self._get, self._table, self._size
+        changes = []
+        for position in self._dirty:
+            if position < self._low - 1 or position > self._high + 1:
+                continue
+            current = get(position)
+            next_state = table[(get(position - 1) * size + current) * size + get(position + 1)]
+            if next_state != current:
+                changes.append((position, next_state))
+
+        dirty = set()
+        for position, state in changes:
+            # A changed edge cell is no longer blank, it stays on the tape
+            if position < self._low or position > self._high:
+                self._extend(position)
+            self._cells[position + self._origin] = state
+            dirty.update((position - 1, position, position + 1))
+        self._dirty = dirty
+        self._generation += 1
+
+    def run(self, generations: int):
+        '''
+            Applies `generations` steps.
+        '''
+        check_generations(generations)
+        for _ in range(generations):
+            self.step()
+
+    def config(self) -> Config:
+        '''
+            Returns a new `Config` of the current generation.
+        '''
+        start, end = self._low + self._origin, self._high + self._origin + 1
+        return Config.from_liste([self._names[state] for state in self._cells[start:end]])
+
+    def __len__(self):
+        return self._high - self._low + 1
+
+    generation = property(lambda x: x._generation)
+    activity = property(lambda x: len(x._dirty))
+    left = property(lambda x: x._low)
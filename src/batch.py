@@ -0,0 +1,88 @@
+import multiprocessing
+import sys
+
+from turing_machine import TuringMachine, CompiledTuringMachine, ArrayTape, read_symbols, ACCEPT, REJECT, TIMEOUT, CYCLE
+
+def compile_script(path: str) -> CompiledTuringMachine:
+    """Parse and compile a Turing Machine script only once, the input word of the script is ignored."""
+    return TuringMachine.from_script(path).compile()
+
+def word_symbols(word: str):
+    """Split a word into symbols : comma-separated if it contains a comma, one symbol per character otherwise."""
+    if "," in word:
+        return read_symbols(word)
+    return iter(word)
+
+def run_word(compiled: CompiledTuringMachine, word: str, limit: int, detect: bool = False) -> tuple[str, str, int]:
+    """Run the compiled TM on a single word and return the record (word, outcome, steps).\n
+    The outcome is TIMEOUT when the limit of step is reached before the TM halts, and with 'detect'
+    it is CYCLE when the configurations of the TM are found to cycle.
+    """
+    tape = ArrayTape.from_iterable(word_symbols(word), compiled.alphabet)
+    if detect:
+        _, state, step, halted, cycle = compiled.execute_detect(tape, 0, 0, limit)
+        if cycle is not None:
+            return (word, CYCLE, step)
+    else:
+        _, state, step, halted = compiled.execute(tape, 0, 0, limit)
+    if not halted:
+        return (word, TIMEOUT, step)
+    return (word, ACCEPT if compiled.finals[state] else REJECT, step)
+
+# Tables of the TM shared by the runs of a worker process
+_worker_compiled: CompiledTuringMachine = None # type: ignore
+_worker_limit: int = 0
+_worker_detect: bool = False
+
+def _init_worker(compiled: CompiledTuringMachine, limit: int, detect: bool):
+    global _worker_compiled, _worker_limit, _worker_detect
+    _worker_compiled = compiled
+    _worker_limit = limit
+    _worker_detect = detect
+
+def _run_in_worker(word: str) -> tuple[str, str, int]:
+    return run_word(_worker_compiled, word, _worker_limit, _worker_detect)
+
+def run_batch(compiled: CompiledTuringMachine, words, limit: int, workers: int | None = None, chunksize: int = 256, ordered: bool = True, detect: bool = False):
+    """This generator run the compiled TM over many words and stream back the records (word, outcome, steps).\n
+    The words are spread over a pool of 'workers' processes (all the cores by default), the compiled tables
+    are sent once to each process. With 'ordered' the records come back in the order of the words.
+    """
+    if workers == 1:
+        for word in words:
+            yield run_word(compiled, word, limit, detect)
+        return
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(compiled, limit, detect)) as pool:
+        if ordered:
+            yield from pool.imap(_run_in_worker, words, chunksize)
+        else:
+            yield from pool.imap_unordered(_run_in_worker, words, chunksize)
+
+def read_words(path: str):
+    """Yield the words of a file, one per line, '-' read the standard input."""
+    source = sys.stdin if path == "-" else open(path, "r")
+    try:
+        for line in source:
+            line = line.strip()
+            if line != "" and not line.startswith("//"):
+                yield line
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    # With --detect the words whose run cycles are reported as CYCLE instead of running until the limit
+    detect = "--detect" in args
+    args = [arg for arg in args if arg != "--detect"]
+    if len(args) < 2:
+        print("usage : batch.py [--detect] <script.tur> <words file | -> [step limit] [workers]")
+        sys.exit(1)
+
+    limit = int(args[2]) if len(args) > 2 else 1_000_000
+    workers = int(args[3]) if len(args) > 3 else None
+
+    compiled = compile_script(args[0])
+    for word, outcome, steps in run_batch(compiled, read_words(args[1]), limit, workers, detect=detect):
+        print(f"{word}\t{outcome}\t{steps}")
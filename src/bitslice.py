@@ -0,0 +1,115 @@
+from cellular_automata import CellularAutomaton, Config
+from engine import Engine
+
+class BitSliceEngine(Engine):
+    '''
+        Bit-parallel stepping of a `CellularAutomaton` with a few states : each
+        bit of the state codes of the whole tape is packed in an integer (a bit
+        plane) and the rules are applied as boolean formulas on the planes, so
+        that a generation cost a few hundred whole-tape shifts and bitwise
+        operations instead of one rule lookup per cell. The tape is the
+        bit planes and the number of cells.
+        Blank is coded 0 so that the cells shifted in from outside are blank.
+    '''
+    MAX_STATES = 5 # Blank included
+
+    def __init__(self, automaton: CellularAutomaton):
+        states = automaton.states
+        k = len(states)
+        if k > BitSliceEngine.MAX_STATES:
+            raise ValueError(f'Too many states for bit slicing : {k}, expected at most {BitSliceEngine.MAX_STATES}.')
+        super().__init__(automaton)
+        # Ordered by code
+        self._names = ('Blank',) + tuple(state for state in states if state != 'Blank')
+        self._codes = {name: code for code, name in enumerate(self._names)}
+        self._k = k
+        self._bits = max(1, (k - 1).bit_length())
+
+        # For each (left, center) : the right states leading to a next state with each bit set
+        dense = automaton._rules.dense()
+        ids = automaton._rules.ids
+        self._formulas = []
+        for left in range(k):
+            for center in range(k):
+                prefix = (ids[self._names[left]] * k + ids[self._names[center]]) * k
+                nexts = [self._codes[states[dense[prefix + ids[self._names[right]]]]] for right in range(k)]
+                terms = []
+                for bit in range(self._bits):
+                    rights = tuple(right for right in range(k) if nexts[right] >> bit & 1)
+                    if rights:
+                        terms.append((bit, rights))
+                if terms:
+                    self._formulas.append((left, center, terms))
+
+    def encode(self, config) -> tuple[list[int], int]:
+        '''
+            Returns the bit planes of a configuration of any type and its
+            number of cells, the bit `i` of a plane is the cell `i` from the left.
+        '''
+        states = config.states()
+        states.reverse()
+        planes = []
+        for bit in range(self._bits):
+            digits = {name: '1' if code >> bit & 1 else '0' for name, code in self._codes.items()}
+            planes.append(int(''.join(map(digits.__getitem__, states)), 2))
+        return planes, len(states)
+
+    def states(self, tape: tuple[list[int], int]) -> list[str]:
+        '''
+            Returns the states of the cells coded by bit planes, from the leftmost to the rightmost.
+        '''
+        planes, width = tape
+        digits = [format(plane, 'b').zfill(width)[::-1] for plane in planes]
+        # The digits of each cell, from the lowest bit, give its state
+        names = {}
+        for code, name in enumerate(self._names):
+            names[tuple('1' if code >> bit & 1 else '0' for bit in range(self._bits))] = name
+        return list(map(names.__getitem__, zip(*digits)))
+
+    def decode(self, tape: tuple[list[int], int], config_type: type = Config):
+        return config_type.from_liste(self.states(tape))
+
+    def step(self, tape: tuple[list[int], int]) -> tuple[list[int], int]:
+        planes, width = tape
+        # Adding theoretical edge cells
+        planes = [plane << 1 for plane in planes]
+        width += 2
+        mask = (1 << width) - 1
+        inverted = [plane ^ mask for plane in planes]
+
+        centers = []
+        for state in range(self._k):
+            match = mask
+            for bit in range(self._bits):
+                match &= planes[bit] if state >> bit & 1 else inverted[bit]
+            centers.append(match)
+        # The neighbours out of the tape are blank
+        lefts = [(match << 1) & mask for match in centers]
+        lefts[0] |= 1
+        rights = [match >> 1 for match in centers]
+        rights[0] |= 1 << (width - 1)
+
+        result = [0] * self._bits
+        unions = {}
+        for left, center, terms in self._formulas:
+            matches = lefts[left] & centers[center]
+            if not matches:
+                continue
+            for bit, states in terms:
+                union = unions.get(states)
+                if union == None:
+                    union = 0
+                    for state in states:
+                        union |= rights[state]
+                    unions[states] = union
+                result[bit] |= matches & union
+
+        # Deleting edge cells if blank
+        if not any(plane & 1 for plane in result):
+            result = [plane >> 1 for plane in result]
+            width -= 1
+        last = 1 << (width - 1)
+        if not any(plane & last for plane in result):
+            result = [plane & (last - 1) for plane in result]
+            width -= 1
+        return result, width
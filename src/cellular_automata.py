@@ -1,7 +1,10 @@
-from cellular_parser import cellular_parser
+from cellular_parser import CellularParser, WILDCARD
+from abc import ABC, abstractmethod
+from array import array
+import hashlib
+import itertools
 import sys
 
-from utils import letter_from_color
 
 def assert_type(val, t):
     '''
@@ -28,12 +31,17 @@ class Cell:
         self._current_state = state
         self._next_state = None
 
-    def update(self):
+    def update(self) -> bool:
+        '''
+            Moves to the next state and returns whether the state changed.
+        '''
         if self._next_state == None:
             raise ValueError('Tried to update a Cell with no next state.')
         else:
+            changed = self._next_state != self._current_state
             self._current_state = self._next_state
             self._next_state = None
+            return changed
 
     def get_current_state(self):
         return self._current_state
@@ -105,6 +113,15 @@ class Config:
         self.rightmost: LinkedListNode = self.leftmost
         self.length: int = 1
 
+    def from_liste(states: list):
+        '''
+            Creates a new Config from a non empty list of states.
+        '''
+        config = Config(states[0])
+        for state in states[1:]:
+            config.push_back(state)
+        return config
+
         
     def push_front(self, current_state, next_state = None):
         '''
@@ -144,6 +161,28 @@ class Config:
 
         self.length -= 1
 
+    def replace(self, states: list):
+        '''
+            Replaces all the cells with new cells of a non empty list of states.
+        '''
+        config = Config.from_liste(states)
+        self.leftmost, self.rightmost, self.length = config.leftmost, config.rightmost, config.length
+
+    def states(self, start: int = 0, end: int = None):
+        '''
+            Returns the states of the cells from the leftmost to the rightmost,
+            or only from the index `start` to the index `end` (excluded).
+        '''
+        states = []
+        current = self.leftmost
+        index = 0
+        while current != None and (end == None or index < end):
+            if index >= start:
+                states.append(current.get_value().get_current_state())
+            current = current.get_towards(Direction.Right)
+            index += 1
+        return states
+
     def __repr__(self):
         '''
             Nice formatting
@@ -159,77 +198,542 @@ class Config:
     def __len__(self):
         return self.length
 
+class InternedConfig(ABC):
+    '''
+        Base of the configurations storing the states of the cells as ids.
+        Once stepped by an automaton, the ids are the ones of its rules.
+    '''
+    def __init__(self):
+        self._names = []
+        self._ids = {}
+        self._bound = None # States of the automaton whose ids are used
+
+    def _intern(self, state: str) -> int:
+        i = self._ids.get(state)
+        if i == None:
+            if self._bound != None:
+                raise ValueError(f'State {state} is not in {self._bound}.')
+            i = len(self._names)
+            self._names.append(state)
+            self._ids[state] = i
+        return i
+
+    @abstractmethod
+    def _remap(self, mapping: list):
+        '''
+            Replaces each id `i` of the cells by `mapping[i]`.
+        '''
+
+    def bind(self, states: tuple):
+        '''
+            Re-encodes the cells with the ids of the tuple of states of an automaton.
+        '''
+        if self._bound is states:
+            return
+        ids = {state: i for i, state in enumerate(states)}
+        for name in self._names:
+            if not name in ids:
+                raise ValueError(f'State {name} is not in {states}.')
+        self._remap([ids[name] for name in self._names])
+        self._names, self._ids, self._bound = list(states), ids, states
+
+    def __repr__(self):
+        '''
+            Nice formatting
+        '''
+        return "|" + "".join(f" {state} |" for state in self.states())
+
+class ArrayConfig(InternedConfig):
+    '''
+        Same interface than `Config`, with the states of the cells interned
+        as ids in a contiguous buffer which grows at both ends with an
+        amortized O(1) cost. Stepping it doesn't allocate any object per cell.
+    '''
+    MIN_CAPACITY = 16
+
+    def __init__(self, first):
+        assert_type(first, str)
+
+        super().__init__()
+        self._cells = array('I', bytes(4 * ArrayConfig.MIN_CAPACITY))
+        self._low = ArrayConfig.MIN_CAPACITY // 2
+        self._high = self._low + 1 # Exclusive
+        self._cells[self._low] = self._intern(first)
+
+    def from_liste(states: list):
+        '''
+            Creates a new ArrayConfig from a non empty list of states.
+        '''
+        config = ArrayConfig(states[0])
+        for state in states[1:]:
+            config.push_back(state)
+        return config
+
+    def _remap(self, mapping: list):
+        cells = self._cells
+        for i in range(self._low, self._high):
+            cells[i] = mapping[cells[i]]
+
+    def push_front_id(self, state: int):
+        if self._low == 0:
+            added = max(len(self._cells), ArrayConfig.MIN_CAPACITY)
+            self._cells[0:0] = array('I', bytes(4 * added))
+            self._low += added
+            self._high += added
+        self._low -= 1
+        self._cells[self._low] = state
+
+    def push_back_id(self, state: int):
+        if self._high == len(self._cells):
+            self._cells.frombytes(bytes(4 * max(len(self._cells), ArrayConfig.MIN_CAPACITY)))
+        self._cells[self._high] = state
+        self._high += 1
+
+    def push_front(self, current_state, next_state = None):
+        '''
+            Pushes the left end in amortized O(1).
+            The next state of a cell isn't stored, each step computes it again.
+        '''
+        assert_type(current_state, str)
+        assert_type(next_state, str)
+        self.push_front_id(self._intern(current_state))
+
+    def push_back(self, current_state, next_state = None):
+        '''
+            Pushes the right end in amortized O(1).
+            The next state of a cell isn't stored, each step computes it again.
+        '''
+        assert_type(current_state, str)
+        assert_type(next_state, str)
+        self.push_back_id(self._intern(current_state))
+
+    def pop_front(self):
+        self._low += 1
+
+    def pop_back(self):
+        self._high -= 1
+
+    def replace(self, states: list):
+        '''
+            Replaces all the cells with new cells of a non empty list of states.
+        '''
+        ids = {state: self._intern(state) for state in set(states)}
+        margin = max(len(states) // 2, ArrayConfig.MIN_CAPACITY)
+        self._cells = array('I', bytes(4 * margin))
+        self._cells.extend(map(ids.__getitem__, states))
+        self._cells.frombytes(bytes(4 * margin))
+        self._low, self._high = margin, margin + len(states)
+
+    def states(self, start: int = 0, end: int = None):
+        '''
+            Returns the states of the cells from the leftmost to the rightmost,
+            or only from the index `start` to the index `end` (excluded).
+        '''
+        names = self._names
+        start = self._low + max(start, 0)
+        end = self._high if end == None else min(self._high, self._low + max(end, 0))
+        return [names[i] for i in self._cells[start:end]]
+
+    def __len__(self):
+        return self._high - self._low
+
+    length = property(__len__)
+
+class RunLengthConfig(InternedConfig):
+    '''
+        Same interface than `Config`, with the cells stored as runs of identical
+        states : the memory used and the cost of a step depend on the number of
+        runs instead of the number of cells, which suits mostly blank tapes.
+    '''
+    def __init__(self, first):
+        assert_type(first, str)
+
+        super().__init__()
+        self._runs = [self._intern(first)] # State id of each run
+        self._lengths = [1]
+        self._length = 1
+
+    def from_liste(states: list):
+        '''
+            Creates a new RunLengthConfig from a non empty list of states.
+        '''
+        config = RunLengthConfig(states[0])
+        for state in states[1:]:
+            config.push_back(state)
+        return config
+
+    def _remap(self, mapping: list):
+        self._runs = [mapping[state] for state in self._runs]
+
+    def push_front(self, current_state, next_state = None):
+        assert_type(current_state, str)
+        assert_type(next_state, str)
+        state = self._intern(current_state)
+        if self._runs[0] == state:
+            self._lengths[0] += 1
+        else:
+            self._runs.insert(0, state)
+            self._lengths.insert(0, 1)
+        self._length += 1
+
+    def push_back(self, current_state, next_state = None):
+        assert_type(current_state, str)
+        assert_type(next_state, str)
+        state = self._intern(current_state)
+        if self._runs[-1] == state:
+            self._lengths[-1] += 1
+        else:
+            self._runs.append(state)
+            self._lengths.append(1)
+        self._length += 1
+
+    def pop_front(self):
+        self._lengths[0] -= 1
+        if self._lengths[0] == 0:
+            del self._runs[0], self._lengths[0]
+        self._length -= 1
+
+    def pop_back(self):
+        self._lengths[-1] -= 1
+        if self._lengths[-1] == 0:
+            self._runs.pop()
+            self._lengths.pop()
+        self._length -= 1
+
+    def replace(self, states: list):
+        '''
+            Replaces all the cells with new cells of a non empty list of states.
+        '''
+        ids = {state: self._intern(state) for state in set(states)}
+        runs, lengths = [], []
+        for state, run in itertools.groupby(states):
+            runs.append(ids[state])
+            lengths.append(sum(1 for _ in run))
+        self._runs, self._lengths, self._length = runs, lengths, len(states)
+
+    def runs(self) -> list[tuple[str, int]]:
+        '''
+            Returns the runs (state, length) from the leftmost to the rightmost.
+        '''
+        return [(self._names[state], length) for state, length in zip(self._runs, self._lengths)]
+
+    def states(self, start: int = 0, end: int = None):
+        '''
+            Returns the states of the cells from the leftmost to the rightmost,
+            or only from the index `start` to the index `end` (excluded).
+        '''
+        start = max(start, 0)
+        end = self._length if end == None else min(end, self._length)
+        states = []
+        position = 0
+        for state, length in zip(self._runs, self._lengths):
+            if position >= end:
+                break
+            if position + length > start:
+                count = min(position + length, end) - max(position, start)
+                states.extend([self._names[state]] * count)
+            position += length
+        return states
+
+    def __len__(self):
+        return self._length
+
+    length = property(__len__)
+
+def check_generations(generations: int):
+    if generations < 0:
+        raise ValueError(f'Can\'t run a negative number of generations : {generations}.')
+
 def check_missing_field_error(fields: dict, expected: list, source: str):
     for e in expected:
         if not e in fields.keys():
             raise ValueError(f'Error in file "{source}" : Missing field "{e}".')
 
-class TreeNode:
-    def __init__(self, name: str):
-        self._name     = name 
-        self._children = []
-
+class RuleTable(dict):
+    '''
+        Next state id of the packed keys of a 3 dimensional `RuleIndex`, filled
+        only with the keys looked up : a cell without rule keeps its state.
+    '''
+    def __init__(self, rules: 'RuleIndex'):
+        self._rules = rules
 
-    def has_child(self, s: str):
-        return s in [c._name for c in self._children]
+    def __missing__(self, key: int) -> int:
+        next_state = self._rules.get_id(key)
+        if next_state == None:
+            next_state = key // self._rules._size % self._rules._size
+        self[key] = next_state
+        return next_state
 
-    def add_child(self, n):
-        self._children.append(n)
+class RuleIndex:
+    '''
+        Constant time storage of the rules : the states are interned as small
+        ids and the next state id of a rule is stored in a dict under the
+        packed key `(left * k + center) * k + right`.
+        Indices are validated once, when a rule is set.
+        A position of an index can also be a class of states or the wildcard
+        `?` matching any state : such patterns are resolved by specificity,
+        an exact rule first, then the pattern matching the fewest indices, the
+        last one set on ties. The resolved keys are cached.
+    '''
+    DENSE_LIMIT = 1 << 20 # Greatest dense table built by `table`, in entries
 
-    def get_child(self, n):
-        for c in self._children:
-            if c._name == n:
-                return c
-        return None
-    
-class IndexTree:
     def __init__(self, index: tuple, dimension: int):
         self._index = index
-        self._root = TreeNode('root')
+        self._ids = {state: i for i, state in enumerate(index)}
+        self._size = len(index)
         self._dimension = dimension
+        self._rules = {}
+        self._dense = None
+        self._table = None
+        self._classes = {}
+        self._patterns = {} # Index -> (set of state ids or `None` at each position, next state id)
+        self._ranking = None
+        self._centered = {} # Center id -> patterns of the ranking matching it
+        self._resolved = {}
+        self._singletons = [frozenset((i,)) for i in range(self._size)]
 
     def check_index_valid(self, index: tuple):
-          
+
         if self._dimension != len(index):
             raise ValueError(f'Expected index of size {self._dimension}, found size {len(index)}.')
         for i in index:
-            if not i in self._index:
+            if not i in self._ids and not i in self._classes and i != WILDCARD:
                 raise ValueError(f'Index {i} is not in {self._index}.')
 
+    def add_class(self, name: str, states: tuple):
+        '''
+            Declares the class `name` of `states`, usable in the indices of the rules set afterwards.
+        '''
+        if name in self._ids or name == WILDCARD:
+            raise ValueError(f'Class {name} is already a state.')
+        for state in states:
+            if not state in self._ids:
+                raise ValueError(f'State {state} of class {name} is not in {self._index}.')
+        self._classes[name] = frozenset(self._ids[state] for state in states)
+
+    def state_id(self, state: str):
+        return self._ids[state]
+
+    def key(self, ids) -> int:
+        '''
+            Packs a tuple of state ids in a single integer.
+        '''
+        key = 0
+        for i in ids:
+            key = key * self._size + i
+        return key
+
     def set(self, index: tuple, value: str):
-        self.check_index_valid(index)
-
-        last = None
-        current = self._root
-        for v in index:
-            last = current
-            current = current.get_child(v) # type: ignore
-            if current == None:
-                current = TreeNode(v)
-                last.add_child(current)
-
-        current._children.clear()
-        current._children.append(TreeNode(value))
-            
-        
-    def get(self, index: tuple):
-        self.check_index_valid(index)
+        if self._dimension != len(index):
+            raise ValueError(f'Expected index of size {self._dimension}, found size {len(index)}.')
+        ids, classes = self._ids, self._classes
+        key, positions, exact = 0, [], True
+        for i in index:
+            state = ids.get(i)
+            if state != None:
+                key = key * self._size + state
+                positions.append(self._singletons[state])
+            elif i in classes:
+                positions.append(classes[i])
+                exact = False
+            elif i == WILDCARD:
+                positions.append(None)
+                exact = False
+            else:
+                raise ValueError(f'Index {i} is not in {self._index}.')
+        if not value in ids:
+            raise ValueError(f'Value {value} is not in {self._index}.')
 
-        current: TreeNode = self._root
-        
+        if exact:
+            self._rules[key] = ids[value]
+        else:
+            # Moved last, it wins the ties
+            self._patterns.pop(index, None)
+            self._patterns[index] = (tuple(positions), ids[value])
+            self._ranking = None
+        self._dense = None
+        self._table = None
+        if self._resolved:
+            self._resolved = {}
+
+    def get(self, index: tuple):
+        ids = self._ids
+        key = 0
         for i in index:
-            current = current.get_child(i) # type: ignore
-            if current == None:
+            state = ids.get(i)
+            if state == None:
                 return None
+            key = key * self._size + state
+
+        next_state = self.get_id(key)
+        if next_state == None:
+            return None
+        return self._index[next_state]
+
+    def _ranked(self) -> list:
+        '''
+            Returns the patterns from the most specific one.
+        '''
+        if self._ranking == None:
+            def weight(pattern) -> int:
+                weight = 1
+                for position in pattern[1][0]:
+                    weight *= self._size if position == None else len(position)
+                return weight
+            patterns = sorted(enumerate(self._patterns.values()), key=lambda pattern: (weight(pattern), -pattern[0]))
+            self._ranking = [pattern for _, pattern in patterns]
+            self._centered = {}
+        return self._ranking
+
+    def _candidates(self, center: int) -> list:
+        '''
+            Returns the patterns matching the state id `center` in the middle of the index, from the most specific one.
+        '''
+        ranking = self._ranked()
+        candidates = self._centered.get(center)
+        if candidates == None:
+            middle = self._dimension // 2
+            candidates = [pattern for pattern in ranking if pattern[0][middle] == None or center in pattern[0][middle]]
+            self._centered[center] = candidates
+        return candidates
+
+    def get_id(self, key: int):
+        '''
+            Returns the next state id of a packed key, or `None` without rule.
+        '''
+        next_state = self._rules.get(key)
+        if next_state != None or len(self._patterns) == 0:
+            return next_state
+        if key in self._resolved:
+            return self._resolved[key]
+
+        ids = []
+        rest = key
+        for _ in range(self._dimension):
+            rest, i = divmod(rest, self._size)
+            ids.append(i)
+        ids.reverse()
+        for positions, value in self._candidates(ids[self._dimension // 2]):
+            if all(position == None or i in position for position, i in zip(positions, ids)):
+                next_state = value
+                break
+        self._resolved[key] = next_state
+        return next_state
+
+    def index_of(self, key: int) -> tuple:
+        '''
+            Unpacks a key in a tuple of states.
+        '''
+        index = []
+        for _ in range(self._dimension):
+            key, i = divmod(key, self._size)
+            index.append(self._index[i])
+        return tuple(reversed(index))
+
+    def items(self):
+        '''
+            Yields every (index, value) pair stored, the patterns last.
+        '''
+        for key, value in self._rules.items():
+            yield (self.index_of(key), self._index[value])
+        for index, (_, value) in self._patterns.items():
+            yield (index, self._index[value])
+
+    def expanded(self) -> dict:
+        '''
+            Returns the next state id of every packed key with a rule, the
+            patterns being resolved.
+        '''
+        if len(self._patterns) == 0:
+            return self._rules
+        rules = {}
+        every = range(self._size)
+        # From the least specific pattern, each one overrides the previous ones
+        for positions, value in reversed(self._ranked()):
+            for ids in itertools.product(*(every if position == None else sorted(position) for position in positions)):
+                rules[self.key(ids)] = value
+        rules.update(self._rules)
+        return rules
+
+    def dense(self) -> list:
+        '''
+            Returns the next state id of every packed key of a 3 dimensional
+            index, a cell without rule keeps its state.
+            The table is cached until a rule is set, it must not be modified.
+        '''
+        if self._dimension != 3:
+            raise ValueError(f'Expected index of size 3, found size {self._dimension}.')
+        if self._dense == None:
+            k = self._size
+            table = [center for center in range(k) for _ in range(k)] * k
+            for key, value in self.expanded().items():
+                table[key] = value
+            self._dense = table
+        return self._dense
+
+    def table(self):
+        '''
+            Returns the next state id of every packed key of a 3 dimensional
+            index : the dense table up to `DENSE_LIMIT` entries, a `RuleTable`
+            filled as the keys are looked up above.
+            The table is cached until a rule is set, it must not be modified.
+        '''
+        if self._dimension != 3:
+            raise ValueError(f'Expected index of size 3, found size {self._dimension}.')
+        if self._size ** 3 <= RuleIndex.DENSE_LIMIT:
+            return self.dense()
+        if self._table == None:
+            self._table = RuleTable(self)
+        return self._table
+
+    def __len__(self):
+        return len(self._rules) + len(self._patterns)
+
+    states = property(lambda x: x._index)
+    ids = property(lambda x: x._ids)
+    classes = property(lambda x: x._classes)
+
+class Cycle:
+    '''
+        Outcome of a run that settles : from the generation `start`, the
+        non-blank cells come back every `period` generations, shifted by
+        `offset` cells (0 for oscillators, non zero for gliders).
+    '''
+    def __init__(self, period: int, offset: int, start: int):
+        self._period = period
+        self._offset = offset
+        self._start = start
+
+    def __eq__(self, value):
+        return isinstance(value, Cycle) and (self._period, self._offset, self._start) == (value.period, value.offset, value.start)
+
+    def __repr__(self):
+        if self._period == 1 and self._offset == 0:
+            return f'fixed point from generation {self._start}'
+        return f'cycles with period {self._period} and offset {self._offset} starting at generation {self._start}'
+
+    period = property(lambda x: x._period)
+    offset = property(lambda x: x._offset)
+    start = property(lambda x: x._start)
+    fixed = property(lambda x: x._period == 1 and x._offset == 0)
 
-        return current._children[0]._name # type: ignore
-      
 class CellularAutomaton:
+    CONVERSION_COST = 2 # Cost of converting a cell for the bit-parallel engine, in cell steps
+
     def __init__(self, states: tuple, subtypes: dict, colors: dict):
-        self._rules = IndexTree(states, 3)
+        self._rules = RuleIndex(states, 3)
         self._colors = colors
         self._subtypes = subtypes
 
+    states = property(lambda x: x._rules.states)
+
+    def blank_is_stable(self) -> bool:
+        '''
+            Checks that a blank cell surrounded by blank cells stays blank, i.e.
+            that the infinite blank background of the tape never changes.
+        '''
+        return self._rules.get(('Blank', 'Blank', 'Blank')) in (None, 'Blank')
+
     def _apply_rules(self, left: Cell, center: Cell, right: Cell):
         next_state = self._rules.get((left.get_current_state(), center.get_current_state(), right.get_current_state()))
         if next_state != None:
@@ -248,7 +752,134 @@ class CellularAutomaton:
                 case Direction.Right:
                     config.push_back('Blank', edge[1]._next_state)
             
-    def step(self, config: Config):
+    def _digest(self, config: Config, stable: bool) -> tuple[bytes, int]:
+        '''
+            Returns a digest of the cells of `config` which doesn't depend on
+            their position, and the index of the first cell digested.
+            With a stable blank background only the non-blank cells matter.
+        '''
+        states = config.states()
+        first, last = 0, len(states)
+        if stable:
+            while first < last and states[first] == 'Blank':
+                first += 1
+            while last > first and states[last - 1] == 'Blank':
+                last -= 1
+        digest = hashlib.blake2b(digest_size=16)
+        for state in states[first:last]:
+            digest.update(state.encode())
+            digest.update(b'\0')
+        return digest.digest(), first
+
+    def run_until_stable(self, config: Config, max_generations: int):
+        '''
+            Applies steps on `config` until a generation repeats an earlier one
+            up to a translation, and returns the `Cycle` found or `None` if
+            there is none in the first `max_generations` generations.
+            `config` is left on the first repeated generation.
+        '''
+        check_generations(max_generations)
+        stable = self.blank_is_stable()
+        left = 0 # Position of the leftmost cell
+        digest, first = self._digest(config, stable)
+        seen = {digest: (0, first)} # digest -> (generation, position of the first cell digested)
+
+        for generation in range(1, max_generations + 1):
+            if self.step(config)[0]:
+                left -= 1
+            digest, first = self._digest(config, stable)
+            if digest in seen:
+                start, position = seen[digest]
+                return Cycle(generation - start, left + first - position, start)
+            seen[digest] = (generation, left + first)
+        return None
+
+    def _step_array(self, config: ArrayConfig) -> tuple[bool, bool, bool]:
+        config.bind(self.states)
+        table = self._rules.table()
+        k = len(self.states)
+        blank = self._rules.state_id('Blank')
+        cells = config._cells
+        low, high = config._low, config._high
+
+        # The theoretical edge cells
+        left = table[(blank * k + blank) * k + cells[low]]
+        right = table[(cells[high - 1] * k + blank) * k + blank]
+
+        changed = False
+        last, current = blank, cells[low]
+        for i in range(low, high - 1):
+            next = cells[i + 1]
+            state = table[(last * k + current) * k + next]
+            if state != current:
+                cells[i] = state
+                changed = True
+            last, current = current, next
+        state = table[(last * k + current) * k + blank]
+        if state != current:
+            cells[high - 1] = state
+            changed = True
+
+        # Adding the edge cells only if not blank
+        if left != blank:
+            config.push_front_id(left)
+        if right != blank:
+            config.push_back_id(right)
+        return (left != blank, right != blank, changed or left != blank or right != blank)
+
+    def _step_runs(self, config: RunLengthConfig) -> tuple[bool, bool, bool]:
+        config.bind(self.states)
+        table = self._rules.table()
+        k = len(self.states)
+        blank = self._rules.state_id('Blank')
+        runs, lengths = config._runs, config._lengths
+        new_runs, new_lengths = [], []
+
+        def emit(state: int, length: int):
+            if new_runs and new_runs[-1] == state:
+                new_lengths[-1] += length
+            else:
+                new_runs.append(state)
+                new_lengths.append(length)
+
+        # The theoretical edge cells
+        left = table[(blank * k + blank) * k + runs[0]]
+        right = table[(runs[-1] * k + blank) * k + blank]
+        if left != blank:
+            emit(left, 1)
+
+        # Inside a run, every cell but the first and the last one has the same neighbourhood
+        last = blank
+        for i, state in enumerate(runs):
+            length = lengths[i]
+            next = runs[i + 1] if i + 1 < len(runs) else blank
+            if length == 1:
+                emit(table[(last * k + state) * k + next], 1)
+            else:
+                emit(table[(last * k + state) * k + state], 1)
+                if length > 2:
+                    emit(table[(state * k + state) * k + state], length - 2)
+                emit(table[(state * k + state) * k + next], 1)
+            last = state
+
+        if right != blank:
+            emit(right, 1)
+        # The runs are merged, so they are equal only if no cell changed
+        changed = new_runs != runs or new_lengths != lengths
+        config._runs, config._lengths = new_runs, new_lengths
+        config._length += (left != blank) + (right != blank)
+        return (left != blank, right != blank, changed)
+
+    def step(self, config: Config) -> tuple[bool, bool, bool]:
+        '''
+            Applies a generation on `config` and returns whether its left and
+            right edges grew, and whether the tape changed.
+        '''
+        if isinstance(config, ArrayConfig):
+            return self._step_array(config)
+        if isinstance(config, RunLengthConfig):
+            return self._step_runs(config)
+
         # Adding theoritical edge cells
 
         config.push_front('Blank')
@@ -282,96 +913,204 @@ class CellularAutomaton:
 
 
         # Updating the cells
+        changed = False
         current = config.leftmost
         while current != None:
-            current.get_value().update()
+            if current.get_value().update():
+                changed = True
             current = current.get_towards(Direction.Right)
 
         # Deleting edge cells if blank
-        if config.leftmost.get_value().get_current_state() == 'Blank':
+        left = config.leftmost.get_value().get_current_state() != 'Blank'
+        if not left:
             config.pop_front()
-        if config.rightmost.get_value().get_current_state() == 'Blank':
+        right = config.rightmost.get_value().get_current_state() != 'Blank'
+        if not right:
             config.pop_back()
-        
-def load_cellular_from_file(path: str):
+        return (left, right, changed)
+
+    def run(self, config: Config, generations: int):
+        '''
+            Applies `generations` steps on `config`. Automata with a few states
+            are run with the bit-parallel engine, the others with `step`.
+            The engine reads and writes the states of `config` directly, it is
+            skipped when converting them would cost more than stepping : a
+            `RunLengthConfig` steps in a time proportional to its number of runs.
+        '''
+        from bitslice import BitSliceEngine
+
+        check_generations(generations)
+        if generations == 0:
+            return
+        stepped = len(config._runs) if isinstance(config, RunLengthConfig) else len(config)
+        if len(self.states) > BitSliceEngine.MAX_STATES or generations * stepped < len(config) * CellularAutomaton.CONVERSION_COST:
+            for _ in range(generations):
+                self.step(config)
+            return
+
+        engine = BitSliceEngine(self)
+        tape = engine.encode(config)
+        for _ in range(generations):
+            tape = engine.step(tape)
+        config.replace(engine.states(tape))
+
+    def step_many(self, config: Config, k: int, tile: int = 4096):
+        '''
+            Applies `k` steps on `config` in a single pass over the tape : it is
+            cut in tiles of `tile` cells and each tile is advanced `k` generations
+            before moving on to the next one, with `k` cells on each side of it
+            recomputed from the neighbouring tiles. `k` should stay small compared to `tile`.
+            The blank edges semantics of `step` are kept, so it falls back to
+            `step` when blank cells don't stay blank.
+        '''
+        check_generations(k)
+        if tile < 1:
+            raise ValueError(f'The size of the tiles need to be positive, found : {tile}.')
+        if not self.blank_is_stable():
+            for _ in range(k):
+                self.step(config)
+            return
+        if k == 0:
+            return
+
+        rules = self._rules
+        size = len(rules.states)
+        table = rules.table()
+        blank = rules.state_id('Blank')
+        cells = [rules.state_id(state) for state in config.states()]
+        length = len(cells)
+
+        # Cells from position -2k to length + 2k, the non-blank cells never go further than k cells away
+        padded = [blank] * (2 * k) + cells + [blank] * (2 * k)
+        row = []
+        leftmost, rightmost = [None] * k, [None] * k # Non-blank extents of each generation
+        for start in range(k, length + 3 * k, tile):
+            end = min(start + tile, length + 3 * k)
+            current = padded[start - k:end + k]
+            for generation in range(k):
+                current = [table[(left * size + center) * size + right] for left, center, right in zip(current, current[1:], current[2:])]
+                offset = start - k + generation + 1 - 2 * k # Position of current[0]
+                for index, state in enumerate(current):
+                    if state != blank:
+                        if leftmost[generation] == None or offset + index < leftmost[generation]:
+                            leftmost[generation] = offset + index
+                        break
+                for index in range(len(current) - 1, -1, -1):
+                    if current[index] != blank:
+                        if rightmost[generation] == None or offset + index > rightmost[generation]:
+                            rightmost[generation] = offset + index
+                        break
+            row.extend(current)
+
+        # Like `step`, an edge cell is only deleted in the generation it is added if blank
+        low = min([0] + [position for position in leftmost if position != None])
+        high = max([length - 1] + [position for position in rightmost if position != None])
+        config.replace([rules.states[state] for state in row[low + k:high + k + 1]])
+
+def load_cellular_from_file(path: str, config_type: type = Config, chunk_size: int = 1 << 20):
+    '''
+        Reads the .cel file `path` by chunks of `chunk_size` characters. Once
+        the states are known, each transition is set in the rules as soon as it
+        is parsed : the transitions are never all kept in memory.
+    '''
     parsed = {}
+    automaton = None
+    stale = True # The automaton doesn't have the last "States" and "Classes" fields
+    pending = [] # The transitions found before the states or the classes they use
+    # Like any field, a "Transitions" field replaces the previous one
+    ended, received = False, False
+
+    def build() -> CellularAutomaton:
+        built = CellularAutomaton(tuple(list(parsed['States'].keys()) + ['Blank']), parsed['States'], {})
+        for name, states in parsed.get('Classes', {}).items():
+            built._rules.add_class(name, states)
+        # The rules set with the previous fields, then the ones waiting for them
+        for transition in list(automaton._rules.items() if automaton != None else ()) + pending:
+            built._rules.set(transition[0], transition[1])
+        pending.clear()
+        return built
+
+    def unknown(transition: tuple) -> bool:
+        if not 'States' in parsed:
+            return True
+        return not 'Classes' in parsed and any(not state in parsed['States'] and state != 'Blank' and state != WILDCARD for state in transition[0])
+
+    def set_transition(transition: tuple):
+        nonlocal automaton, stale, ended, received
+        if ended:
+            automaton, stale, ended = None, True, False
+            pending.clear()
+        received = True
+        # Kept in order after a waiting transition
+        if pending or unknown(transition):
+            pending.append(transition)
+            return
+        if stale:
+            automaton, stale = build(), False
+        automaton._rules.set(transition[0], transition[1])
+
     with open(path) as stream:
-        parsed = cellular_parser(stream.read())
-    print(parsed)
+        for title, field in CellularParser(stream=stream, chunk_size=chunk_size).fields({'Transitions': set_transition}):
+            parsed[title] = field
+            if title == 'States' or title == 'Classes':
+                stale = True
+                if pending and not any(unknown(transition) for transition in pending):
+                    automaton, stale = build(), False
+            elif title == 'Transitions':
+                if not received:
+                    automaton, stale = None, True
+                    pending.clear()
+                ended, received = True, False
 
     check_missing_field_error(parsed, ['Colors', 'States', 'Transitions', 'Initialisation'], path)
 
-    config = Config(parsed['Initialisation'][0]);
-    for cell in parsed['Initialisation'][1:]:
-        config.push_back(cell)
+    config = config_type.from_liste(parsed['Initialisation'])
 
     parsed['Colors']['Blank'] = (255, 255, 255)
 
-    automaton = CellularAutomaton(tuple(list(parsed['States'].keys()) + ['Blank']), parsed['States'], parsed['Colors'])
+    if stale or pending:
+        automaton = build()
+    automaton._colors = parsed['Colors']
 
-    for transition in parsed['Transitions']:
-        automaton._rules.set(transition, parsed['Transitions'][transition])        
+    for cell in parsed['Initialisation']:
+        if not cell in automaton._rules.ids:
+            raise ValueError(f'Error in file "{path}" : Unknown state "{cell}" in field "Initialisation".')
 
     return (automaton, config)
 
 if __name__ == '__main__':
     import pygame
+    from renderer import CellularView, Pacer
     
     args = sys.argv[1:]
     if len(args)>0:
-        (automaton, config) = load_cellular_from_file(args[0])
+        (automaton, config) = load_cellular_from_file(args[0], ArrayConfig)
     else:
-        (automaton, config) = load_cellular_from_file('res/elargissement.cel')    
+        (automaton, config) = load_cellular_from_file('res/elargissement.cel', ArrayConfig)    
 
     pygame.init()
     screen = pygame.display.set_mode((800, 600))
     font = pygame.font.SysFont('Arial', 16)
     clock = pygame.time.Clock()
+    view = CellularView(automaton, screen, font)
+    pacer = Pacer(60 / 25) # A generation every 25 frames, the arrows change the pace
     running = True
-    compteur = 0
-    result = ""
+    still = False
 
-    while running or result!="":
+    while running:
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-                result=""
+            pacer.handle(event)
 
         screen.fill("white")
-
-        current = config.leftmost
-        i = 0
-        while current != None:
-            
-            # Drawing a cell
-            try:
-                # Tries to draw as letter
-                letter = letter_from_color(automaton._colors[automaton._subtypes[current.get_value().get_current_state()]])
-                pygame.draw.rect(
-                    screen,
-                    "black",
-                    (400 + (i - len(config)/2) * 20, 300, 20, 20),
-                    1
-                )
-                screen.blit(
-                    font.render(letter, True, (0, 0, 0)),
-                    dest = (405 + (i - len(config)/2) * 20, 300, 0, 0)
-                )
-            except:
-                # Not a letter matchin magic value state
-                pygame.draw.rect(
-                    screen,
-                    automaton._colors[automaton._subtypes[current.get_value().get_current_state()]],
-                    (400 + (i - len(config)/2) * 20, 300, 20, 20)
-                )
-            
-            current = current.get_towards(Direction.Right)
-            i += 1
-        
+        view.draw(config)
         pygame.display.flip()
 
-        clock.tick(60)
-        compteur = (compteur + 1)%25
-        if compteur == 0:
-            automaton.step(config)
+        steps = pacer.steps(clock.tick(60))
+        if steps > 0 and not still:
+            if steps > 1:
+                automaton.run(config, steps - 1)
+            # Stops stepping once the configuration doesn't change anymore
+            still = not automaton.step(config)[2]
@@ -1,27 +1,19 @@
+import re
 
+SPACES = re.compile(r'[ \t]*')
+EMPTY_LINES = re.compile(r'\s*')
+NAME_END = re.compile(r'[\w*]*')
+NUMBER = re.compile(r'[0-9_ ]*')
+WILDCARD = '?' # Matches any state in a transition
 
-class IntRef:
-    def __init__(self, value):
-        self.value = value
-        
-    def get_v(self): return self.value
-    def set_v(self, x: int): self.value = x
-
-    v = property(get_v, set_v)
-
-    def increment(self, offset = 1):
-        self.value += offset
-    def decrement(self, offset = 1):
-        self.value -= offset
-    
-    def __eq__(self, v: int):
-        return self.value == v
-    def __lt__(self, v: int):
-        return self.value < v
-    def __gt__(self, v: int):
-        return self.value > v
-    def __repr__(self):
-        return str(self.value)
+# Tuple values in their usual form : a number, or a name that can't be read as a number or the wildcard
+VALUE = re.compile(r'[ \t]*(?:([0-9][0-9_ ]*)|([A-Za-z*][A-Za-z0-9*_]*|\?))[ \t]*')
+TUPLE = re.compile(r'\(([^()\n]*)\)')
+# A whole transition of three names or wildcards in its usual form, with its separator
+TRANSITION = re.compile(
+    r'[ \t]*\([ \t]*([A-Za-z*][A-Za-z0-9*_]*|\?)[ \t]*,[ \t]*([A-Za-z*][A-Za-z0-9*_]*|\?)[ \t]*,[ \t]*([A-Za-z*][A-Za-z0-9*_]*|\?)[ \t]*\)'
+    r'[ \t]*->[ \t]*([A-Za-z*_][A-Za-z0-9*_]*)[ \t]*(?:(,)\s*|(?=\n))'
+)
 
 def parsing_error_str(cursor: int, expected: str, found: str):
     if found == ' ':
@@ -30,227 +22,250 @@ def parsing_error_str(cursor: int, expected: str, found: str):
         found = 'indentation'
     elif found == '\n':
         found = 'line break'
-    
-    return f'Error at byte {cursor}. expected: "{expected}", found: "{found}".'
 
-def skip_empty_lines(source: str, cursor: IntRef):
-    while cursor < len(source) and source[cursor.v].isspace():
-        cursor.increment()
-
-def skip_spaces_until(sentinel: str, source: str, cursor: IntRef):
-    while cursor < len(source):
-        current = source[cursor.v]
-        if current == sentinel:
-            break
-        elif current != ' ' and current != '\t':
-            raise ValueError(parsing_error_str(cursor.v, sentinel, current))
-        cursor.increment()
- 
+    return f'Error at byte {cursor}. expected: "{expected}", found: "{found}".'
 
-def number_parser(source: str, cursor: IntRef) -> int:
+class CellularParser:
     '''
-        Returns parsed integer contained in any `str`.
-        Accepts underscore and spaces in number.
-        Raises a `ValueError` if source does not contain
-        any number at cursor.
+        Single pass parser of the .cel files : each token is read at once with
+        a regular expression from the cursor, which only moves forward.
+        The usual forms of the tuples and of the transitions are matched as a
+        whole, anything else is read token by token to report the position of
+        the error.
+        With a `stream`, the source is read by chunks of `chunk_size`
+        characters and the text before the cursor is dropped.
     '''
-    parsed = ""
-    while cursor < len(source):
-        current = source[cursor.v]
-        if '0' <= current <= '9':
-            parsed += current
-        elif current != '_' and current != ' ':
-            break
-        cursor.increment()
-    
-    if parsed == "":
-        raise ValueError(parsing_error_str(cursor.v, 'number', source[cursor.v]))
-    return int(parsed)
-    
+    def __init__(self, source: str = '', stream = None, chunk_size: int = 1 << 20):
+        self._source = source
+        self._length = len(source)
+        self._cursor = 0
+        self._offset = 0 # Position in the whole source of the start of `_source`
+        self._stream = stream
+        self._chunk_size = chunk_size
+        # The cursor can move up to there without reading the stream
+        self._safe = self._length if stream == None else -1
 
-def tuple_parser(source: str, cursor: IntRef):
-    '''
-        Parses a tuple of integers.
-        blank characters (except line break) ignored.
-    '''
-    state = 0
-    parsed: list = None # type: ignore
-    while cursor < len(source):
-        current = source[cursor.v]
-        if current != ' ' and current != '\t':
-            match state:
-                case 0:
-                    # Before opening parenthesis
-                    if current == '(':
-                        parsed = []
-                        state = 1
-                    else:
-                        raise ValueError(parsing_error_str(cursor.v, '(', current))
-                case 1:
-                    # Value parsing
-                    to_append = None
-                    base_cursor = cursor.v
-                    try:
-                        to_append = number_parser(source, cursor) # type: ignore
-                    except:
-                        cursor.v = base_cursor
-                        to_append = name_parser(source, cursor)
+    def _fill(self):
+        '''
+            Reads the stream until the line of the cursor and the first non
+            blank character after it are in the buffer : every entry stands on
+            a line, only the blank lines between entries can span chunks.
+        '''
+        while self._stream != None and self._cursor > self._safe:
+            chunk = self._stream.read(self._chunk_size)
+            consumed = min(self._cursor, self._length)
+            self._source = self._source[consumed:] + chunk
+            self._offset += consumed
+            self._cursor -= consumed
+            self._length = len(self._source)
+            if chunk == '':
+                self._stream = None
+                self._safe = self._length
+            else:
+                self._safe = self._source.rfind('\n', 0, len(self._source.rstrip()))
 
-                    parsed.append(to_append)
-                    cursor.decrement()
-                    state = 2
-                case 2:
-                    # Making sure separator or closing is here
-                    if current == ',':
-                        state = 1
-                    elif current == ')':
-                        break
-                    else:
-                        raise ValueError(parsing_error_str(cursor.v, 'separator or closed parenthesis', current))
-                    
-        cursor.increment()
-    
-    return tuple(parsed) # type: ignore
+    def _error(self, cursor: int, expected: str) -> ValueError:
+        found = self._source[cursor] if cursor < self._length else 'end of file'
+        return ValueError(parsing_error_str(self._offset + min(cursor, self._length), expected, found))
 
+    def _skip_spaces_until(self, sentinel: str):
+        self._cursor = SPACES.match(self._source, self._cursor).end()
+        if self._cursor < self._length and self._source[self._cursor] != sentinel:
+            raise self._error(self._cursor, sentinel)
 
-def name_parser(source: str, cursor: IntRef):
-    state = 0
-    parsed = ""
-    while cursor < len(source):
-        current = source[cursor.v]
-        match state:
-            case 0:
-                # Before name
-                if current.isalpha() or current == '*' or current == '_':
-                    parsed += current
-                    state = 1
-                elif current != ' ' and current != '\t':
-                    raise ValueError(parsing_error_str(cursor.v, 'letter, "*" or "_"', current))
-            case 1:
-                # During name
-                if current.isalnum() or current == '*' or current == '_':
-                    parsed += current
-                else:
-                    break
-        cursor.increment()
-    return parsed
+    def name(self) -> str:
+        '''
+            Parses a name, spaces before it ignored.
+            Returns an empty name at the end of the source.
+        '''
+        source = self._source
+        start = SPACES.match(source, self._cursor).end()
+        if start >= self._length:
+            self._cursor = start
+            return ''
+        current = source[start]
+        if not (current.isalpha() or current == '*' or current == '_'):
+            raise self._error(start, 'letter, "*" or "_"')
+        self._cursor = NAME_END.match(source, start + 1).end()
+        return source[start:self._cursor]
 
-def dummy_name_parser(source: str, cursor: IntRef):
-    n = name_parser(source, cursor)
-    cursor.decrement()
-    return n
+    def value(self):
+        '''
+            Parses an integer, accepting underscores and spaces in it, a name or the wildcard.
+        '''
+        if self._source.startswith(WILDCARD, self._cursor):
+            self._cursor += 1
+            return WILDCARD
+        match = NUMBER.match(self._source, self._cursor)
+        digits = match.group().replace('_', '').replace(' ', '')
+        if digits == '':
+            return self.name()
+        self._cursor = match.end()
+        return int(digits)
 
-def assignation_parser(source: str, cursor: IntRef):
-    name = name_parser(source, cursor)
-    found_arrow = False
-    while cursor < len(source) - 1:
-        current = source[cursor.v]
-        next = source[cursor.v + 1]
-        if current == '<' and next == '-':
-            found_arrow = True
-            cursor.increment(2)
-            break
-        elif current != ' ' and current != '\t':
-            raise ValueError(parsing_error_str(cursor.v, 'left arrow (<-)', current))
-        cursor.increment()
-    
-    if not found_arrow:
-       raise ValueError(parsing_error_str(cursor.v, 'left arrow (<-)', 'end of file')) 
-    
-    return (name, tuple_parser(source, cursor))
-    
-def parse_dict(field_function, source: str, cursor: IntRef, in_fact_list = False):
-    result = {}
-    if in_fact_list:
-        result = []
-    state = 0
-    while cursor < len(source):
-        current = source[cursor.v]
-        match state:
-            case 0:
-                line = field_function(source, cursor)
-                if in_fact_list:
-                    result.append(line)
-                else:
-                    result[line[0]] = line[1]
-                state = 1
-            case 1:
-                if current == ',':
-                    cursor.increment()
-                    skip_empty_lines(source, cursor)
-                    cursor.decrement()
-                    state = 0
-                elif current == '\n':
+    def tuple(self) -> tuple:
+        '''
+            Parses a tuple of integers and names, the cursor is left on the
+            closing parenthesis. blank characters (except line break) ignored.
+        '''
+        source = self._source
+        cursor = SPACES.match(source, self._cursor).end()
+        if cursor >= self._length or source[cursor] != '(':
+            raise self._error(cursor, '(')
+
+        match = TUPLE.match(source, cursor)
+        if match != None:
+            parsed = []
+            for value in match.group(1).split(','):
+                value = VALUE.fullmatch(value)
+                if value == None:
                     break
-                elif current != ' ' and current != '\t':
-                    raise ValueError(parsing_error_str(cursor.v, 'line break or new line', current))
-        cursor.increment()
-        
-    return result
+                parsed.append(int(value.group(1).replace('_', '').replace(' ', '')) if value.group(2) == None else value.group(2))
+            else:
+                self._cursor = match.end() - 1
+                return tuple(parsed)
 
+        parsed = []
+        self._cursor = cursor + 1
+        while True:
+            self._cursor = SPACES.match(source, self._cursor).end()
+            if self._cursor >= self._length:
+                break
+            parsed.append(self.value())
 
-def subtype_parser(source: str, cursor: IntRef):
-    name = name_parser(source, cursor)
-    
-    skip_spaces_until('(', source, cursor)
-    # Cursor on '('
-    cursor.increment()
-    subtype = name_parser(source, cursor)
-    skip_spaces_until(')', source, cursor)
+            self._cursor = SPACES.match(source, self._cursor).end()
+            if self._cursor >= self._length:
+                break
+            current = source[self._cursor]
+            if current == ')':
+                break
+            elif current != ',':
+                raise self._error(self._cursor, 'separator or closed parenthesis')
+            self._cursor += 1
+        return tuple(parsed)
 
-    return (name, subtype) 
+    def assignation(self) -> tuple:
+        name = self.name()
+        cursor = SPACES.match(self._source, self._cursor).end()
+        if cursor >= self._length - 1:
+            raise ValueError(parsing_error_str(self._offset + max(self._cursor, self._length - 1), 'left arrow (<-)', 'end of file'))
+        if self._source[cursor:cursor + 2] != '<-':
+            raise self._error(cursor, 'left arrow (<-)')
+        self._cursor = cursor + 2
+        value = self.tuple()
+        self._cursor += 1
+        return (name, value)
 
+    def subtype(self) -> tuple:
+        name = self.name()
+        self._skip_spaces_until('(')
+        # Cursor on '('
+        self._cursor += 1
+        subtype = self.name()
+        self._skip_spaces_until(')')
+        self._cursor += 1
+        return (name, subtype)
 
-def transition_parser(source: str, cursor: IntRef):
-    left = tuple_parser(source, cursor)
-    cursor.increment()
+    def transition(self) -> tuple:
+        left = self.tuple()
+        self._cursor += 1
 
-    skip_spaces_until('-', source, cursor)
-    cursor.increment()
-    
-    if source[cursor.v] != '>':
-        raise ValueError(parsing_error_str(cursor.v, '>', source[cursor.v]))
-    cursor.increment()
+        self._skip_spaces_until('-')
+        self._cursor += 1
+        if self._cursor >= self._length or self._source[self._cursor] != '>':
+            raise self._error(self._cursor, '>')
+        self._cursor += 1
 
-    right = name_parser(source, cursor)
-    cursor.decrement()
+        return (left, self.name())
 
-    return (left, right)
+    def entries(self, entry_function, in_fact_list: bool = False, sink = None):
+        '''
+            Parses the entries of a field separated by commas, until a line
+            break not preceded by a comma.
+            With a `sink`, each entry is given to it instead of being kept.
+        '''
+        result = [] if in_fact_list else {}
+        fast = entry_function == self.transition
+        while True:
+            if self._cursor > self._safe:
+                self._fill()
+            source, length = self._source, self._length
+            if self._cursor >= length:
+                break
+            if fast:
+                # Most transitions are read here, the separator included
+                match = TRANSITION.match(source, self._cursor)
+                if match != None:
+                    if sink == None:
+                        result[match.group(1, 2, 3)] = match.group(4)
+                    else:
+                        sink((match.group(1, 2, 3), match.group(4)))
+                    self._cursor = match.end()
+                    if match.group(5) == None:
+                        break
+                    continue
 
+            line = entry_function()
+            if sink != None:
+                sink(line)
+            elif in_fact_list:
+                result.append(line)
+            else:
+                result[line[0]] = line[1]
 
-def field_parser(source: str, cursor: IntRef):
-    skip_empty_lines(source, cursor)
-    
-    title = name_parser(source, cursor)
-    
-    while cursor < len(source):
-        current = source[cursor.v]
-        if current == ':':
-            cursor.increment(2)
-            break
-        elif current != ' ' and current != '\t':
-            raise ValueError(parsing_error_str(cursor.v, ':', current))
-        cursor.increment()
-    
-    data = {}
-    match title:
-        case "Colors":
-            data = parse_dict(assignation_parser,source, cursor)
-        case "States":
-            data = parse_dict(subtype_parser, source, cursor)
-        case "Transitions":
-            data = parse_dict(transition_parser, source, cursor)
-        case "Initialisation":
-            data = parse_dict(dummy_name_parser, source, cursor, True)
-    
-    return (title, data)
+            self._cursor = SPACES.match(source, self._cursor).end()
+            if self._cursor >= length:
+                break
+            current = source[self._cursor]
+            if current == '\n':
+                break
+            elif current != ',':
+                raise self._error(self._cursor, 'line break or new line')
+            self._cursor = EMPTY_LINES.match(source, self._cursor + 1).end()
+        return result
 
-def cellular_parser(source: str):
-    cursor = IntRef(0)
-    data = {}
-    while cursor < len(source):
-        field = field_parser(source, cursor)
-        print(f"{field[0]} parsed !")
-        data[field[0]] = field[1]
-    return data
+    def field(self, sinks: dict = {}) -> tuple:
+        self._fill()
+        self._cursor = EMPTY_LINES.match(self._source, self._cursor).end()
+        self._fill()
+        title = self.name()
+
+        self._cursor = SPACES.match(self._source, self._cursor).end()
+        if self._cursor < self._length:
+            if self._source[self._cursor] != ':':
+                raise self._error(self._cursor, ':')
+            self._cursor += 2
 
+        data = {}
+        sink = sinks.get(title)
+        match title:
+            case "Colors":
+                data = self.entries(self.assignation, False, sink)
+            case "States":
+                data = self.entries(self.subtype, False, sink)
+            case "Classes":
+                data = self.entries(self.assignation, False, sink)
+            case "Transitions":
+                data = self.entries(self.transition, False, sink)
+            case "Initialisation":
+                data = self.entries(self.name, True, sink)
+
+        return (title, data)
+
+    def fields(self, sinks: dict = {}):
+        '''
+            Yields the title and the data of each field. The entries of a field
+            whose title is in `sinks` are given to its sink as they are parsed,
+            its data is then empty.
+        '''
+        while True:
+            self._fill()
+            if self._cursor >= self._length:
+                break
+            yield self.field(sinks)
+
+    def parse(self) -> dict:
+        return dict(self.fields())
+
+def cellular_parser(source: str):
+    return CellularParser(source).parse()
@@ -0,0 +1,239 @@
+from array import array
+from bisect import bisect_left
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+from cellular_automata import CellularAutomaton, Config, RuleIndex, load_cellular_from_file
+
+MAGIC = b'CELC'
+VERSION = 2
+# magic, version, flags, number of states, length of the initial configuration,
+# number of rules, length of the metadata, sha256 of the source file
+HEADER = struct.Struct('<4sHHIIQQ32s')
+DENSE = 1 # Flag of a file holding the dense rule table
+DENSE_LIMIT = 1 << 24 # Greatest dense table written, in entries
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+def _dense_code(k: int) -> str:
+    '''
+        Returns the smallest array type code holding the state ids of `k` states.
+    '''
+    return 'B' if k <= 1 << 8 else 'H' if k <= 1 << 16 else 'I'
+
+def source_digest(path: str) -> bytes:
+    '''
+        Returns the sha256 of the file `path`.
+    '''
+    digest = hashlib.sha256()
+    with open(path, 'rb') as stream:
+        for chunk in iter(lambda: stream.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+class MappedRuleIndex(RuleIndex):
+    '''
+        `RuleIndex` read from a memory-mapped compiled file : the packed keys
+        of the exact rules are sorted, a rule is found by bisection, and the
+        dense table is used in place, so the processes mapping the same file
+        share its pages. The classes and the patterns are kept as in the source.
+        Setting a rule copies the rules in a dict first.
+    '''
+    def __init__(self, index: tuple, keys: memoryview, values: memoryview, dense: memoryview | None,
+                 classes: dict, patterns: list):
+        RuleIndex.__init__(self, index, 3)
+        for name, states in classes.items():
+            self.add_class(name, states)
+        for pattern, value in patterns:
+            RuleIndex.set(self, pattern, value)
+        self._keys = keys
+        self._values = values
+        self._dense = dense
+
+    def _thaw(self):
+        if self._keys != None:
+            self._rules = dict(zip(self._keys, self._values))
+            self._keys, self._values = None, None
+
+    def set(self, index: tuple, value: str):
+        self._thaw()
+        RuleIndex.set(self, index, value)
+
+    def get(self, index: tuple):
+        ids = self._ids
+        key = 0
+        for i in index:
+            state = ids.get(i)
+            if state == None:
+                return None
+            key = key * self._size + state
+
+        next_state = self.get_id(key)
+        if next_state == None:
+            return None
+        return self._index[next_state]
+
+    def get_id(self, key: int):
+        if self._keys == None:
+            return RuleIndex.get_id(self, key)
+        i = bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            return RuleIndex.get_id(self, key) # Only the patterns are left
+        return self._values[i]
+
+    def items(self):
+        if self._keys == None:
+            yield from RuleIndex.items(self)
+            return
+        for key, value in zip(self._keys, self._values):
+            yield (self.index_of(key), self._index[value])
+        for index, (_, value) in self._patterns.items():
+            yield (index, self._index[value])
+
+    def dense(self) -> list:
+        if self._dense == None and self._keys != None:
+            k = self._size
+            table = [center for center in range(k) for _ in range(k)] * k
+            for key, value in self._expanded_patterns().items():
+                table[key] = value
+            for key, value in zip(self._keys, self._values):
+                table[key] = value
+            self._dense = table
+        return RuleIndex.dense(self)
+
+    def table(self):
+        # The mapped dense table costs nothing to use
+        if self._keys != None and self._dense != None:
+            return self._dense
+        return RuleIndex.table(self)
+
+    def _expanded_patterns(self) -> dict:
+        '''
+            Returns the next state id of every packed key matched by a pattern.
+        '''
+        if len(self._patterns) == 0:
+            return {}
+        return RuleIndex.expanded(self) # The exact rules are still mapped
+
+    def expanded(self) -> dict:
+        if self._keys == None:
+            return RuleIndex.expanded(self)
+        rules = self._expanded_patterns()
+        rules.update(zip(self._keys, self._values))
+        return rules
+
+    def __len__(self):
+        return RuleIndex.__len__(self) if self._keys == None else len(self._keys) + len(self._patterns)
+
+def compile_cellular(source_path: str, compiled_path: str):
+    '''
+        Parses the .cel file `source_path` and writes its states, colors, rules
+        and initial configuration in the binary file `compiled_path`.
+        The exact rules are packed, the classes and the patterns are written as
+        they are declared instead of the keys they match.
+        The dense rule table is written too when it has at most `DENSE_LIMIT` entries.
+    '''
+    automaton, config = load_cellular_from_file(source_path)
+    rules = automaton._rules
+    k = len(rules.states)
+
+    packed = sorted(rules._rules.items())
+    keys = array('Q', [key for key, _ in packed])
+    values = array('I', [value for _, value in packed])
+    dense = array(_dense_code(k), rules.dense() if k ** 3 <= DENSE_LIMIT else [])
+    initial = array('I', [rules.state_id(state) for state in config.states()])
+    classes = {name: [rules.states[state] for state in sorted(states)] for name, states in rules.classes.items()}
+    patterns = [(index, rules.states[value]) for index, (_, value) in rules._patterns.items()]
+    metadata = json.dumps({'states': rules.states, 'subtypes': automaton._subtypes, 'colors': automaton._colors,
+                           'classes': classes, 'patterns': patterns}).encode()
+    if sys.byteorder == 'big':
+        for table in (keys, values, dense, initial):
+            table.byteswap()
+
+    header = HEADER.pack(MAGIC, VERSION, DENSE if len(dense) > 0 else 0, k, len(initial), len(keys), len(metadata), source_digest(source_path))
+    # Written aside then renamed, the processes mapping the previous file keep reading it
+    temporary = compiled_path + '.tmp'
+    with open(temporary, 'wb') as stream:
+        stream.write(header)
+        stream.write(metadata)
+        stream.write(bytes(_align(len(header) + len(metadata)) - len(header) - len(metadata)))
+        stream.write(keys)
+        stream.write(values)
+        stream.write(bytes(_align(4 * len(values)) - 4 * len(values)))
+        stream.write(dense)
+        stream.write(bytes(_align(dense.itemsize * len(dense)) - dense.itemsize * len(dense)))
+        stream.write(initial)
+    os.replace(temporary, compiled_path)
+
+def _section(view: memoryview, offset: int, count: int, code: str):
+    data = view[offset:offset + count * array(code).itemsize]
+    if sys.byteorder == 'little':
+        return data.cast(code)
+    table = array(code, data.tobytes())
+    table.byteswap()
+    return table
+
+def load_compiled(compiled_path: str, config_type: type = Config, source_path: str | None = None):
+    '''
+        Returns the automaton and the initial configuration of the compiled
+        file `compiled_path`, mapped in memory.
+        With `source_path`, checks that the file was compiled from this source.
+    '''
+    with open(compiled_path, 'rb') as stream:
+        memory = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(memory) < HEADER.size or memory[:len(MAGIC)] != MAGIC:
+        raise ValueError(f'Error in file "{compiled_path}" : Not a compiled automaton.')
+    _, version, flags, k, length, count, size, digest = HEADER.unpack_from(memory)
+    if version != VERSION:
+        raise ValueError(f'Error in file "{compiled_path}" : Unsupported version {version}, expected {VERSION}.')
+    if source_path != None and source_digest(source_path) != digest:
+        raise ValueError(f'Error in file "{compiled_path}" : Not compiled from the current "{source_path}".')
+
+    keys_offset = _align(HEADER.size + size)
+    dense_offset = _align(keys_offset + 12 * count)
+    dense_size = k ** 3 if flags & DENSE else 0
+    initial_offset = _align(dense_offset + array(_dense_code(k)).itemsize * dense_size)
+    if len(memory) < initial_offset + 4 * length:
+        raise ValueError(f'Error in file "{compiled_path}" : Truncated file.')
+
+    metadata = json.loads(memory[HEADER.size:HEADER.size + size])
+    states = tuple(metadata['states'])
+    colors = {name: tuple(color) for name, color in metadata['colors'].items()}
+    view = memoryview(memory)
+    keys = _section(view, keys_offset, count, 'Q')
+    values = _section(view, keys_offset + 8 * count, count, 'I')
+    dense = _section(view, dense_offset, dense_size, _dense_code(k)) if flags & DENSE else None
+
+    automaton = CellularAutomaton(states, metadata['subtypes'], colors)
+    patterns = [(tuple(index), value) for index, value in metadata['patterns']]
+    automaton._rules = MappedRuleIndex(states, keys, values, dense, metadata['classes'], patterns)
+    config = config_type.from_liste([states[state] for state in _section(view, initial_offset, length, 'I')])
+    return (automaton, config)
+
+def load_cellular_cached(source_path: str, config_type: type = Config, compiled_path: str | None = None):
+    '''
+        Loads the .cel file `source_path` from its compiled file, next to it
+        by default, which is compiled again when missing or out of date.
+    '''
+    if compiled_path == None:
+        compiled_path = os.path.splitext(source_path)[0] + '.celc'
+    if os.path.exists(compiled_path):
+        try:
+            return load_compiled(compiled_path, config_type, source_path)
+        except ValueError:
+            pass
+    compile_cellular(source_path, compiled_path)
+    return load_compiled(compiled_path, config_type, source_path)
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if len(args) < 1:
+        print('usage : compiled_automaton.py <script.cel> [output.celc]')
+        sys.exit(1)
+
+    compile_cellular(args[0], args[1] if len(args) > 1 else os.path.splitext(args[0])[0] + '.celc')
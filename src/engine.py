@@ -0,0 +1,47 @@
+from abc import ABC, abstractmethod
+
+from cellular_automata import CellularAutomaton, Config, check_generations
+
+class Engine(ABC):
+    '''
+        Base of the engines stepping a `CellularAutomaton` on their own
+        encoding of the tape, usually the interned state ids of its cells.
+        Every engine keeps the blank edges semantics of `CellularAutomaton.step` :
+        the cells out of the tape are blank, one cell is added on each side at
+        each generation and is deleted again if it stays blank.
+        A subclass implements `step`, and `encode` and `decode` when its tape
+        isn't a list of state ids.
+    '''
+    def __init__(self, automaton: CellularAutomaton):
+        rules = automaton._rules
+        self._names = rules.states
+        self._ids = rules.ids
+        self._blank = rules.state_id('Blank')
+
+    def encode(self, config):
+        '''
+            Returns the tape of a configuration of any type.
+        '''
+        return [self._ids[state] for state in config.states()]
+
+    def decode(self, tape, config_type: type = Config):
+        '''
+            Returns a new configuration of type `config_type` from a tape.
+        '''
+        return config_type.from_liste([self._names[state] for state in tape])
+
+    @abstractmethod
+    def step(self, tape):
+        '''
+            Returns the next generation of `tape`.
+        '''
+
+    def run(self, config, generations: int):
+        '''
+            Returns a new configuration of the type of `config` after `generations` steps of it.
+        '''
+        check_generations(generations)
+        tape = self.encode(config)
+        for _ in range(generations):
+            tape = self.step(tape)
+        return self.decode(tape, type(config))
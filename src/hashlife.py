@@ -0,0 +1,208 @@
+from itertools import islice
+
+from cellular_automata import CellularAutomaton, Config, check_generations
+
+class HashNode:
+    '''
+        Block of 2^level cells made of two blocks of 2^(level - 1) cells.
+        The blocks of a single cell are the state ids themselves.
+        Nodes are hash-consed by `HashlifeEngine` : two equal blocks are
+        the same object, so they are compared and hashed by identity.
+    '''
+    __slots__ = ('left', 'right', 'level')
+
+    def __init__(self, left, right, level: int):
+        self.left = left
+        self.right = right
+        self.level = level
+
+class HashlifeEngine:
+    '''
+        Memoized super-stepping of a `CellularAutomaton` in the manner of Hashlife :
+        the tape is a tree of hash-consed blocks and the center half of each block
+        after 2^j generations is memoized, so that repeated local patterns are
+        only ever computed once and a jump of `n` generations cost about log(n)
+        block lookups on oscillating or regularly growing automata.
+        The automaton needs a stable blank background, and the tape returned
+        is trimmed to its non-blank cells.
+        The blocks and the memoized results are each bounded by `max_cache`
+        entries, the oldest ones being forgotten as soon as it is reached.
+    '''
+    def __init__(self, automaton: CellularAutomaton, max_cache: int = 1 << 20):
+        if not automaton.blank_is_stable():
+            raise ValueError('Hashlife needs the rule (Blank, Blank, Blank) -> Blank.')
+        if max_cache < 1:
+            raise ValueError(f'The size of the cache need to be positive, found : {max_cache}.')
+        self._names = automaton.states
+        self._ids = automaton._rules.ids
+        self._k = len(self._names)
+        self._table = automaton._rules.table()
+        self._max_cache = max_cache
+
+        self._nodes = {}  # (left, right) -> HashNode
+        self._memo = {}   # (node, j) -> center of node after 2^j generations
+        self._blanks = [self._ids['Blank']] # Blank block of each level
+
+    def _join(self, left, right) -> HashNode:
+        key = (left, right)
+        node = self._nodes.get(key)
+        if node is None:
+            level = 1 if isinstance(left, int) else left.level + 1
+            node = HashNode(left, right, level)
+            if len(self._nodes) >= self._max_cache:
+                self._evict()
+            self._nodes[key] = node
+        return node
+
+    def _evict(self):
+        '''
+            Forgets the oldest quarter of the blocks, in the middle of a jump.
+            A block built again afterwards is a new object that only misses the
+            memoized results of the old one, the blank blocks stay unique.
+        '''
+        for old in list(islice(self._nodes, len(self._nodes) // 4 + 1)):
+            del self._nodes[old]
+        for blank in self._blanks[1:]:
+            self._nodes[(blank.left, blank.right)] = blank
+
+    def _blank(self, level: int):
+        while len(self._blanks) <= level:
+            self._blanks.append(self._join(self._blanks[-1], self._blanks[-1]))
+        return self._blanks[level]
+
+    def _center(self, node: HashNode) -> HashNode:
+        return self._join(node.left.right, node.right.left)
+
+    def _successor(self, node: HashNode, j: int) -> HashNode:
+        '''
+            Returns the center half of `node` after 2^j generations, with
+            0 <= j <= level - 2 so that it only depends on the cells of `node`.
+        '''
+        key = (node, j)
+        result = self._memo.get(key)
+        if result is not None:
+            return result
+
+        if node.level == 2:
+            k, table = self._k, self._table
+            c0, c1 = node.left.left, node.left.right
+            c2, c3 = node.right.left, node.right.right
+            result = self._join(table[(c0 * k + c1) * k + c2], table[(c1 * k + c2) * k + c3])
+        else:
+            left, right = node.left, node.right
+            middle = self._join(left.right, right.left)
+            if j == node.level - 2:
+                # Two successive jumps of 2^(j - 1) generations
+                r0 = self._successor(left, j - 1)
+                r1 = self._successor(middle, j - 1)
+                r2 = self._successor(right, j - 1)
+                j -= 1
+            else:
+                r0 = self._center(left)
+                r1 = self._center(middle)
+                r2 = self._center(right)
+            result = self._join(self._successor(self._join(r0, r1), j), self._successor(self._join(r1, r2), j))
+
+        if len(self._memo) >= self._max_cache:
+            # Evicts the oldest quarter of the memoized results
+            for old in list(islice(self._memo, len(self._memo) // 4 + 1)):
+                del self._memo[old]
+        self._memo[key] = result
+        return result
+
+    def _build(self, ids: list) -> HashNode:
+        size = 2
+        while size < len(ids):
+            size *= 2
+        layer = ids + [self._blanks[0]] * (size - len(ids))
+        while len(layer) > 1:
+            layer = [self._join(layer[i], layer[i + 1]) for i in range(0, len(layer), 2)]
+        return layer[0]
+
+    def _expand(self, root: HashNode, origin: int) -> tuple[HashNode, int]:
+        '''
+            Doubles the size of `root` with blank cells around it.
+        '''
+        blank = self._blank(root.level - 1)
+        root = self._join(self._join(blank, root.left), self._join(root.right, blank))
+        return root, origin - (1 << (root.level - 2))
+
+    def _fits(self, root: HashNode, j: int) -> bool:
+        '''
+            Checks that everything reachable by the cells of `root` in 2^j
+            generations stays in its center half.
+        '''
+        level = root.level
+        if level < j + 3:
+            return False
+        outer, inner = self._blank(level - 2), self._blank(level - 3)
+        return root.left.left == outer and root.right.right == outer \
+            and root.left.right.left == inner and root.right.left.right == inner
+
+    def _jump(self, root: HashNode, origin: int, j: int) -> tuple[HashNode, int]:
+        while not self._fits(root, j):
+            root, origin = self._expand(root, origin)
+        origin += 1 << (root.level - 2)
+        root = self._successor(root, j)
+        return root, origin
+
+    def _extent(self, node, level: int, offset: int):
+        '''
+            Returns the positions of the first and last non-blank cells of `node`, or `None`.
+        '''
+        if node == self._blank(level):
+            return None
+        if level == 0:
+            return (offset, offset)
+        half = 1 << (level - 1)
+        left = self._extent(node.left, level - 1, offset)
+        right = self._extent(node.right, level - 1, offset + half)
+        if left == None:
+            return right
+        if right == None:
+            return left
+        return (left[0], right[1])
+
+    def _cells(self, node, level: int, offset: int, start: int, end: int, out: list):
+        '''
+            Appends the ids of the cells of `node` between `start` and `end` to `out`.
+        '''
+        size = 1 << level
+        low, high = max(start, offset), min(end, offset + size)
+        if low >= high:
+            return
+        if node == self._blank(level):
+            out.extend([self._blanks[0]] * (high - low))
+        elif level == 0:
+            out.append(node)
+        else:
+            self._cells(node.left, level - 1, offset, start, end, out)
+            self._cells(node.right, level - 1, offset + size // 2, start, end, out)
+
+    def advance(self, config: Config, generations: int) -> tuple[Config, int]:
+        '''
+            Returns a new `Config` after `generations` steps of `config`, and the
+            position of its leftmost cell relatively to the leftmost cell of `config`.
+        '''
+        check_generations(generations)
+        root = self._build([self._ids[state] for state in config.states()])
+        origin = 0
+        for j in range(generations.bit_length()):
+            if generations >> j & 1:
+                root, origin = self._jump(root, origin, j)
+
+        extent = self._extent(root, root.level, origin)
+        if extent == None:
+            return Config('Blank'), 0
+        cells = []
+        self._cells(root, root.level, origin, extent[0], extent[1] + 1, cells)
+        return Config.from_liste([self._names[state] for state in cells]), extent[0]
+
+    def run(self, config: Config, generations: int) -> Config:
+        '''
+            Returns a new `Config` after `generations` steps of `config`.
+        '''
+        return self.advance(config, generations)[0]
+
+    def __repr__(self):
+        return f'HashlifeEngine -- {len(self._nodes)} blocks ; {len(self._memo)} memoized results'
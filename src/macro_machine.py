@@ -0,0 +1,146 @@
+from array import array
+import math
+
+from turing_machine import TuringMachine, CompiledTuringMachine, ArrayTape
+
+class MacroMachine:
+    """This class run a Turing Machine by macro-steps.\n
+    The tape is grouped in blocks of block_size cells and the effect of the TM entering a block
+    in a given state (resulting block, exit side and exit state) is memoized : sweeping over
+    a block already seen in the same state cost a single lookup instead of one step per cell.
+    The number of steps stay exactly the one counted by 'TuringMachine.run'.
+    """
+
+    def __init__(self, tm: TuringMachine, block_size: int = 8, max_cache: int = 1 << 20):
+        assert isinstance(tm, TuringMachine), "ERROR : A MacroMachine take in input of it constructor a TuringMachine object."
+        if block_size < 1:
+            raise ValueError(f"The block size need to be positive, found : {block_size}")
+        self._tm = tm
+        self._compiled: CompiledTuringMachine = tm.compiled if tm.compiled is not None else tm.compile()
+        self._block_size = block_size
+        self._max_cache = max_cache
+        self._blank = (0,) * block_size
+        # key : (state, block, entry position), value : (block, exit position, state, steps, halted, lowest, highest)
+        self._cache = {}
+
+    def _simulate(self, state: int, block: tuple, position: int, budget: int | float):
+        """Run the TM step by step inside a block, until it leaves the block, halts or the budget is spent.\n
+        Return (block, position, state, steps, halted, lowest, highest) where halted is None when the budget is spent,
+        and lowest and highest are the extreme positions of the head, the cell it exits on included.
+        """
+        compiled = self._compiled
+        cells = list(block)
+        steps = 0
+        lowest = highest = position
+        while steps < budget:
+            entry = compiled.lookup(state, cells[position])
+            if entry is None:
+                return tuple(cells), position, state, steps, True, lowest, highest
+            write, move, state = entry
+            cells[position] = write
+            steps += 1
+            if move == 1:
+                position -= 1
+                if position < lowest:
+                    lowest = position
+                if position < 0:
+                    return tuple(cells), position, state, steps, False, lowest, highest
+            elif move == 2:
+                position += 1
+                if position > highest:
+                    highest = position
+                if position == self._block_size:
+                    return tuple(cells), position, state, steps, False, lowest, highest
+        return tuple(cells), position, state, steps, None, lowest, highest
+
+    def execute(self, tape: ArrayTape, state: int, step: int, limit: int | None = None) -> tuple[ArrayTape,int,int,bool]:
+        """Same as 'CompiledTuringMachine.execute' with macro-steps, return the tuple (tape, state_id, step, halted)."""
+        if limit is None:
+            limit = math.inf
+        tape.rebind(self._compiled.alphabet)
+        size = self._block_size
+        cells = tape._cells
+
+        # The blocks are aligned on the indices of the buffer of the tape
+        blocks = {}
+        for index in range(tape._low // size, tape._high // size + 1):
+            block = tuple(cells[index * size:(index + 1) * size])
+            blocks[index] = block + self._blank[len(block):]
+        current, position = divmod(tape._head, size)
+        # The visited extent is tracked like 'CompiledTuringMachine.execute' does
+        low, high = tape._low, tape._high
+
+        cache = self._cache
+        halted = False
+        while step < limit:
+            block = blocks.get(current, self._blank)
+            key = (state, block, position)
+            result = cache.get(key)
+            if result is None or step + result[3] > limit:
+                result = self._simulate(state, block, position, limit - step)
+                if result[4] is not None:
+                    if len(cache) >= self._max_cache:
+                        cache.clear()
+                    cache[key] = result
+            block, position, state, steps, halted, lowest, highest = result
+            blocks[current] = block
+            step += steps
+            low = min(low, current * size + lowest)
+            high = max(high, current * size + highest)
+            if halted is None:
+                halted = False
+                break
+            if halted:
+                if step < limit:
+                    step += 1 # The step where no transition is found
+                else:
+                    halted = False
+                break
+            if position < 0:
+                current -= 1
+                position = size - 1
+            elif position == size:
+                current += 1
+                position = 0
+
+        self._write_back(tape, blocks, current * size + position, low, high)
+        return tape, state, step, halted
+
+    def _write_back(self, tape: ArrayTape, blocks: dict, head: int, low: int, high: int):
+        """Copy the blocks in the buffer of the tape, move its head and set its visited extent."""
+        size = self._block_size
+        start = min(min(blocks), head // size) * size
+        shift = 0
+        while start + shift < 0:
+            shift += tape._grow_left()
+        end = max(max(blocks) + 1, head // size + 1) * size
+        while end + shift > len(tape._cells):
+            tape._grow_right()
+
+        cells = tape._cells
+        for index, block in blocks.items():
+            cells[shift + index * size:shift + (index + 1) * size] = array("H", block)
+        tape._head = head + shift
+        tape._low = low + shift
+        tape._high = high + shift
+
+    def run_with_limit(self, limit: int | None) -> bool:
+        """Run the Turing Machine by macro-steps while the limit of step isn't reached."""
+        compiled, tape, state, tape_type = self._tm.compiled_configuration()
+        if compiled is not self._compiled: # The memoized macro-steps belong to other tables
+            self._compiled = compiled
+            self._cache.clear()
+        tape, state, step, _ = self.execute(tape, state, self._tm.step, limit)
+        self._tm.restore_configuration(tape, state, tape_type)
+        self._tm.set_step(step)
+        return self._tm.check_final()
+
+    def run(self) -> bool:
+        """Run the Turing Machine by macro-steps while there is transitions."""
+        return self.run_with_limit(None)
+
+    def __repr__(self):
+        return f"MacroMachine -- blocks of {self._block_size} cells ; {len(self._cache)} memoized macro-steps"
+
+    tm = property(lambda x: x._tm)
+    block_size = property(lambda x: x._block_size)
@@ -0,0 +1,49 @@
+import numpy as np
+
+from cellular_automata import CellularAutomaton, Config
+from engine import Engine
+
+class NumpyEngine(Engine):
+    '''
+        Vectorized stepping of a `CellularAutomaton` : the tape is a NumPy array
+        of interned state ids and the rules a dense k×k×k array, so that a whole
+        generation is computed with a single shifted-index gather.
+    '''
+    MAX_TABLE_SIZE = 1 << 27
+
+    def __init__(self, automaton: CellularAutomaton):
+        super().__init__(automaton)
+
+        k = len(self._names)
+        if k ** 3 > NumpyEngine.MAX_TABLE_SIZE:
+            raise ValueError(f'Too many states for a dense rule table : {k}.')
+        self._dtype = np.uint8 if k <= 1 << 8 else np.uint16 if k <= 1 << 16 else np.uint32
+
+        # A cell without rule keeps its state, then the rules are scattered on their packed keys
+        self._table = np.empty((k, k, k), dtype=self._dtype)
+        self._table[:] = np.arange(k, dtype=self._dtype)[None, :, None]
+        rules = automaton._rules.expanded()
+        keys = np.fromiter(rules.keys(), dtype=np.int64, count=len(rules))
+        self._table.reshape(-1)[keys] = np.fromiter(rules.values(), dtype=self._dtype, count=len(rules))
+
+    def encode(self, config) -> np.ndarray:
+        '''
+            Returns the tape of `config` as an array of state ids.
+        '''
+        return np.fromiter((self._ids[state] for state in config.states()), dtype=self._dtype, count=len(config))
+
+    def decode(self, tape: np.ndarray, config_type: type = Config):
+        return super().decode(tape.tolist(), config_type)
+
+    def step(self, tape: np.ndarray) -> np.ndarray:
+        '''
+            Returns the next generation of `tape`.
+        '''
+        padded = np.full(len(tape) + 4, self._blank, dtype=self._dtype)
+        padded[2:-2] = tape
+        # Every cell and the two theoretical edge cells
+        updated = self._table[padded[:-2], padded[1:-1], padded[2:]]
+
+        start = 1 if updated[0] == self._blank else 0
+        end = len(updated) - 1 if updated[-1] == self._blank else len(updated)
+        return updated[start:end]
@@ -0,0 +1,136 @@
+from array import array
+from multiprocessing import shared_memory
+import multiprocessing
+import os
+
+from cellular_automata import CellularAutomaton, RuleIndex, check_generations
+from engine import Engine
+
+# Commands of the coordinator to the workers
+RUN = 0
+STOP = 1
+
+def _worker(index: int, workers: int, memory: shared_memory.SharedMemory, capacity: int, table: array, size: int,
+            control, start, end):
+    '''
+        Applies the rules on the tile `index` of the tape at each generation,
+        between the two barriers of the coordinator.
+    '''
+    buffers = [memory.buf[:2 * capacity].cast('H'), memory.buf[2 * capacity:4 * capacity].cast('H')]
+    while True:
+        start.wait()
+        if control[0] == STOP:
+            break
+        source, target = buffers[control[1]], buffers[1 - control[1]]
+        # The tape and its two theoretical edge cells
+        low, high = control[2] - 1, control[3] + 1
+        first = low + (high - low) * index // workers
+        last = low + (high - low) * (index + 1) // workers
+        if first < last:
+            # The cells of the tile and a one cell halo on each side
+            cells = source[first - 1:last + 1].tolist()
+            target[first:last] = array('H', [table[(left * size + center) * size + right] for left, center, right in zip(cells, cells[1:], cells[2:])])
+        end.wait()
+    for buffer in buffers:
+        buffer.release()
+
+class ParallelEngine(Engine):
+    '''
+        Multi-core stepping of a `CellularAutomaton` : the tape is a buffer of
+        state ids in shared memory, split into one tile per worker process.
+        The workers compute a generation between two barriers of the coordinator,
+        which then handles the growth of the tape at its blank edges, so no
+        cell is ever pickled between processes.
+    '''
+    def __init__(self, automaton: CellularAutomaton, workers: int | None = None):
+        rules = automaton._rules
+        # Each worker receives a copy of the dense table
+        if len(rules.states) ** 3 > RuleIndex.DENSE_LIMIT:
+            raise ValueError(f'Too many states for a dense rule table shared with the workers : {len(rules.states)}.')
+        super().__init__(automaton)
+        self._table = array('H', rules.dense())
+        self._workers = workers if workers != None else os.cpu_count() or 1
+        if self._workers < 1:
+            raise ValueError(f'The number of workers need to be positive, found : {self._workers}.')
+
+    def _start(self, cells: list, low: int, high: int, capacity: int):
+        '''
+            Copies the cells from `low` to `high` in the middle of a new shared buffer and starts the workers.
+        '''
+        self._capacity = capacity
+        self._memory = shared_memory.SharedMemory(create=True, size=4 * capacity)
+        self._buffers = [self._memory.buf[:2 * capacity].cast('H'), self._memory.buf[2 * capacity:].cast('H')]
+        self._buffers[0][:] = array('H', [self._blank]) * capacity
+        self._buffers[1][:] = array('H', [self._blank]) * capacity
+        self._low = (capacity - (high - low)) // 2
+        self._high = self._low + high - low
+        self._buffers[0][self._low:self._high] = array('H', cells[low:high])
+        self._source = 0
+
+        context = multiprocessing.get_context()
+        self._control = context.RawArray('q', 4)
+        self._barriers = (context.Barrier(self._workers + 1), context.Barrier(self._workers + 1))
+        self._processes = [
+            context.Process(target=_worker, daemon=True, args=(index, self._workers, self._memory, capacity,
+                            self._table, len(self._names), self._control) + self._barriers)
+            for index in range(self._workers)
+        ]
+        for process in self._processes:
+            process.start()
+
+    def _stop(self) -> list:
+        '''
+            Stops the workers, frees the shared buffer and returns the cells of the tape.
+        '''
+        self._control[0] = STOP
+        self._barriers[0].wait()
+        for process in self._processes:
+            process.join()
+        cells = self._buffers[self._source][self._low:self._high].tolist()
+        for buffer in self._buffers:
+            buffer.release()
+        self._memory.close()
+        self._memory.unlink()
+        return cells
+
+    def _step(self):
+        control = self._control
+        control[0], control[1], control[2], control[3] = RUN, self._source, self._low, self._high
+        self._barriers[0].wait()
+        self._barriers[1].wait()
+
+        # Deleting edge cells if blank : they stay outside of the tape
+        self._source = 1 - self._source
+        target = self._buffers[self._source]
+        if target[self._low - 1] != self._blank:
+            self._low -= 1
+        if target[self._high] != self._blank:
+            self._high += 1
+
+    def _advance(self, cells: list, generations: int) -> list:
+        '''
+            Returns the cells after `generations` steps, the workers are started once for all of them.
+        '''
+        if generations == 0:
+            return cells
+
+        # Room for the edge cells of the next generations, the buffer is doubled when it is full
+        self._start(cells, 0, len(cells), len(cells) + 2 * min(generations, len(cells) + 64) + 4)
+        try:
+            for _ in range(generations):
+                if self._low < 2 or self._high > self._capacity - 2:
+                    cells = self._stop()
+                    self._start(cells, 0, len(cells), 2 * self._capacity)
+                self._step()
+        finally:
+            cells = self._stop()
+        return cells
+
+    def step(self, tape: list) -> list:
+        return self._advance(tape, 1)
+
+    def run(self, config, generations: int):
+        check_generations(generations)
+        return self.decode(self._advance(self.encode(config), generations), type(config))
+
+    workers = property(lambda x: x._workers)
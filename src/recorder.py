@@ -0,0 +1,255 @@
+from array import array
+import json
+import math
+import mmap
+import struct
+
+from turing_machine import TuringMachine
+from cellular_automata import CellularAutomaton, Config
+
+'''
+    Layout of a trace file :
+        - header : magic, kind, version, size of the metadata, number of initial cells
+        - metadata : a JSON object (names of the symbols or states, initial head, state, ...)
+        - initial cells : the ids of the initial tape, as unsigned 32 bits integers
+        - padding up to a multiple of 8 bytes
+        - records : fixed-width little endian records until the end of the file
+
+    A Turing Machine record is written for each step that applies a transition : the step,
+    the state id and the head position after the step, and the symbol id written by the step
+    (on the cell under the head before it moved).
+    A Cellular Automaton record is written for each cell whose state changed : the generation,
+    the position of the cell and its new state id.
+    Positions are relative to the first cell of the initial tape.
+'''
+
+MAGIC = b'MSTRACE\0'
+VERSION = 1
+
+KIND_TM = 0
+KIND_CA = 1
+
+HEADER = struct.Struct('<8sHHIQ')
+MOVES = (0, -1, 1) # Offset of the head for each value of `MoveTo`
+RECORDS = {
+    KIND_TM: struct.Struct('<QIqI'), # step, state, head, written symbol
+    KIND_CA: struct.Struct('<QqI'),  # generation, position, new state
+}
+
+class TraceWriter:
+    '''
+        Buffered writer of the fixed-width records of a trace.
+    '''
+    def __init__(self, path: str, kind: int, metadata: dict, initial: list[int], buffer_size: int = 1 << 16):
+        if kind not in RECORDS:
+            raise ValueError(f'Unknown kind of trace : {kind}.')
+        self._stream = open(path, 'wb')
+        self._record = RECORDS[kind]
+        self._buffer = bytearray()
+        self._buffer_size = buffer_size
+        self._count = 0
+
+        encoded = json.dumps(metadata).encode()
+        cells = array('I', initial).tobytes()
+        header = HEADER.pack(MAGIC, kind, VERSION, len(encoded), len(initial)) + encoded + cells
+        self._stream.write(header + bytes(-len(header) % 8))
+
+    def write(self, *fields):
+        self._buffer += self._record.pack(*fields)
+        self._count += 1
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        self._stream.write(self._buffer)
+        self._buffer.clear()
+
+    def close(self):
+        if not self._stream.closed:
+            self.flush()
+            self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+def record_turing_machine(tm: TuringMachine, path: str, limit: int | None = None, buffer_size: int = 1 << 16) -> bool:
+    '''
+        Runs `tm` with its compiled tables while there is transitions and
+        the limit of step isn't reached, writing one record per step in `path`.
+        Returns if the final state is accepting, like `TuringMachine.run`.
+    '''
+    compiled, tape, state, tape_type = tm.compiled_configuration()
+    if limit is None:
+        limit = math.inf
+
+    symbols, head = tape.snapshot()
+    metadata = {
+        'symbols': compiled.alphabet.symbols,
+        'finals': compiled.finals,
+        'state': state,
+        'step': tm.step,
+        'head': head,
+    }
+    ids = compiled.alphabet.ids
+
+    with TraceWriter(path, KIND_TM, metadata, [ids[symbol] for symbol in symbols], buffer_size) as writer:
+        step = tm.step
+        while step < limit:
+            entry = compiled.lookup(state, tape.symbol_id)
+            tape, state, step, halted = compiled.execute(tape, state, step, step + 1)
+            if halted:
+                break
+            write, move, _ = entry
+            head += MOVES[move]
+            writer.write(step, state, head, write)
+    tm.set_step(step)
+    tm.restore_configuration(tape, state, tape_type)
+    return tm.check_final()
+
+def record_cellular_automaton(automaton: CellularAutomaton, config: Config, path: str, generations: int, buffer_size: int = 1 << 16):
+    '''
+        Applies `generations` steps of `automaton` on `config`, writing
+        a record for each cell whose state changed in `path`.
+    '''
+    names = list(automaton.states)
+    ids = {name: index for index, name in enumerate(names)}
+    row = config.states()
+    left = 0 # Position of the leftmost cell
+
+    with TraceWriter(path, KIND_CA, {'states': names}, [ids[state] for state in row], buffer_size) as writer:
+        for generation in range(1, generations + 1):
+            old_left = left
+            if automaton.step(config)[0]:
+                left -= 1
+
+            new_row = config.states()
+            for index, state in enumerate(new_row):
+                old_index = left + index - old_left
+                old = row[old_index] if 0 <= old_index < len(row) else 'Blank'
+                if state != old:
+                    writer.write(generation, left + index, ids[state])
+            row = new_row
+
+class TraceReader:
+    '''
+        Memory-mapped reader of a trace, for replay and analysis without simulation.
+    '''
+    def __init__(self, path: str):
+        self._stream = open(path, 'rb')
+        self._map = mmap.mmap(self._stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, kind, version, meta_size, initial_count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f'"{path}" is not a trace file.')
+        if version != VERSION:
+            raise ValueError(f'Unsupported trace version {version} in "{path}".')
+        self._kind = kind
+        self._record = RECORDS[kind]
+
+        offset = HEADER.size
+        self._metadata = json.loads(self._map[offset:offset + meta_size])
+        offset += meta_size
+        self._initial = array('I', self._map[offset:offset + 4 * initial_count])
+        offset += 4 * initial_count
+        self._start = offset + (-offset % 8)
+        self._count = (len(self._map) - self._start) // self._record.size
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index: int) -> tuple:
+        if not -self._count <= index < self._count:
+            raise IndexError('Trace record index out of range.')
+        return self._record.unpack_from(self._map, self._start + (index % self._count) * self._record.size)
+
+    def __iter__(self):
+        end = self._start + self._count * self._record.size
+        with memoryview(self._map) as view, view[self._start:end] as records:
+            yield from self._record.iter_unpack(records)
+
+    def _bisect(self, key: int) -> int:
+        '''
+            Number of records whose first field (step or generation) is at most `key`.
+        '''
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self[middle][0] <= key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def tape_at(self, step: int) -> tuple[list[str], int, int]:
+        '''
+            Replays a Turing Machine trace until `step` and returns the
+            tape (from its leftmost written cell), the index of the head and the state id.
+        '''
+        if self._kind != KIND_TM:
+            raise ValueError('This trace is not the trace of a Turing Machine.')
+        symbols = self._metadata['symbols']
+        cells = {position: cell for position, cell in enumerate(self._initial)}
+        head, state = self._metadata['head'], self._metadata['state']
+        for index in range(self._bisect(step)):
+            _, state, new_head, written = self[index]
+            cells[head] = written
+            head = new_head
+        cells.setdefault(head, 0)
+
+        low, high = min(cells), max(cells)
+        return [symbols[cells.get(position, 0)] for position in range(low, high + 1)], head - low, state
+
+    def row_at(self, generation: int) -> tuple[int, list[str]]:
+        '''
+            Replays a Cellular Automaton trace until `generation` and returns
+            the position of the leftmost cell and the states of the cells.
+        '''
+        if self._kind != KIND_CA:
+            raise ValueError('This trace is not the trace of a Cellular Automaton.')
+        names = self._metadata['states']
+        cells = {position: state for position, state in enumerate(self._initial)}
+        for index in range(self._bisect(generation)):
+            _, position, state = self[index]
+            cells[position] = state
+
+        low, high = min(cells), max(cells)
+        blank = names.index('Blank')
+        return low, [names[cells.get(position, blank)] for position in range(low, high + 1)]
+
+    def close(self):
+        self._map.close()
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    kind = property(lambda x: x._kind)
+    metadata = property(lambda x: x._metadata)
+    initial = property(lambda x: x._initial)
+
+if __name__ == '__main__':
+    import sys
+    from cellular_automata import load_cellular_from_file
+
+    args = sys.argv[1:]
+    if len(args) != 3:
+        print('usage : recorder.py <script.tur | automaton.cel> <trace path> <steps or generations>')
+        sys.exit(1)
+
+    if args[0].endswith('.tur'):
+        record_turing_machine(TuringMachine.from_script(args[0]), args[1], int(args[2]))
+    else:
+        (automaton, config) = load_cellular_from_file(args[0])
+        record_cellular_automaton(automaton, config, args[1], int(args[2]))
+
+    with TraceReader(args[1]) as reader:
+        print(f'{len(reader)} records written in "{args[1]}".')
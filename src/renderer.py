@@ -0,0 +1,176 @@
+import pygame
+
+try:
+    import numpy as np
+except ImportError: # The colored cells are then filled one by one
+    np = None
+
+from utils import letter_from_color
+
+class GlyphCache:
+    '''
+        Renders each text with the font only once, the viewers draw the
+        same few symbols on every frame.
+    '''
+    def __init__(self, font: pygame.font.Font):
+        self._font = font
+        self._glyphs = {}
+
+    def glyph(self, text: str, color: tuple = (0, 0, 0)) -> pygame.Surface:
+        key = (text, color)
+        glyph = self._glyphs.get(key)
+        if glyph == None:
+            glyph = self._font.render(text, True, color)
+            self._glyphs[key] = glyph
+        return glyph
+
+    def cell(self, text: str, background, size: int, border: bool = False, offset: tuple = (0, 0)) -> pygame.Surface:
+        '''
+            Returns a pre-rendered cell of `size` pixels with `text` on it.
+        '''
+        key = (text, background, size, border, offset)
+        cell = self._glyphs.get(key)
+        if cell == None:
+            cell = pygame.Surface((size, size))
+            cell.fill(background)
+            if border:
+                pygame.draw.rect(cell, 'black', (0, 0, size, size), 1)
+            cell.blit(self.glyph(text), offset)
+            self._glyphs[key] = cell
+        return cell
+
+class Pacer:
+    '''
+        Decouples the simulation from the frame rate : it gives the number of
+        steps to run on each frame for a rate in steps per second.
+        The up and down arrows double and halve the rate, space pauses.
+    '''
+    def __init__(self, rate: float, max_rate: float = 1 << 20):
+        self._rate = rate
+        self._max_rate = max_rate
+        self._credit = 0.0
+        self._paused = False
+
+    def handle(self, event: pygame.event.Event):
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_UP:
+            self._rate = min(self._rate * 2, self._max_rate)
+        elif event.key == pygame.K_DOWN:
+            self._rate = max(self._rate / 2, 1 / 64)
+        elif event.key == pygame.K_SPACE:
+            self._paused = not self._paused
+
+    def steps(self, elapsed: int) -> int:
+        '''
+            Returns the number of steps to run after `elapsed` milliseconds.
+        '''
+        if self._paused:
+            return 0
+        self._credit += self._rate * elapsed / 1000
+        steps = int(self._credit)
+        self._credit -= steps
+        return steps
+
+    rate = property(lambda x: x._rate)
+    paused = property(lambda x: x._paused)
+
+class CellRow:
+    '''
+        Draws a row of cells on the screen, skipping the cells out of it.
+        The colored cells are drawn with a single blit through `surfarray`.
+    '''
+    def __init__(self, screen: pygame.Surface, y: int, size: int):
+        self._screen = screen
+        self._y = y
+        self._size = size
+
+    def visible(self, count: int, origin: float) -> tuple[int, int]:
+        '''
+            Returns the range of indices of the cells on the screen, the cell
+            `i` of a row of `count` cells being drawn at `origin + i * size`.
+        '''
+        first = max(0, int(-origin // self._size))
+        last = min(count, int((self._screen.get_width() - origin) // self._size) + 1)
+        return first, max(first, last)
+
+    def draw_colors(self, colors: list, x: float):
+        '''
+            Draws a cell of each color, the first one at `x`.
+        '''
+        if len(colors) == 0:
+            return
+        size = self._size
+        if np == None:
+            for index, color in enumerate(colors):
+                self._screen.fill(color, (x + index * size, self._y, size, size))
+            return
+        pixels = np.array(colors, dtype=np.uint8).reshape(len(colors), 1, 3)
+        surface = pygame.transform.scale(pygame.surfarray.make_surface(pixels), (len(colors) * size, size))
+        self._screen.blit(surface, (x, self._y))
+
+    def draw_cells(self, cells: list, x: float):
+        '''
+            Draws pre-rendered cells, the first one at `x`. A `None` cell is skipped.
+        '''
+        size = self._size
+        self._screen.blits([(cell, (x + index * size, self._y)) for index, cell in enumerate(cells) if cell != None], False)
+
+class CellularView:
+    '''
+        Draws the tape of a cellular automaton centered on the screen. The way
+        each state is drawn (a color or a letter) is computed only once.
+    '''
+    SIZE = 20
+
+    def __init__(self, automaton, screen: pygame.Surface, font: pygame.font.Font, y: int = 300):
+        self._row = CellRow(screen, y, CellularView.SIZE)
+        self._glyphs = GlyphCache(font)
+        self._colors = {}
+        self._letters = {}
+        for state in automaton.states:
+            color = automaton._colors.get(automaton._subtypes.get(state, state), (255, 255, 255))
+            try:
+                letter = letter_from_color(color)
+                self._letters[state] = self._glyphs.cell(letter, (255, 255, 255), CellularView.SIZE, True, (5, 0))
+                self._colors[state] = (255, 255, 255)
+            except ValueError:
+                # Not a letter matching magic value state
+                self._colors[state] = color
+
+    def draw(self, config):
+        size = CellularView.SIZE
+        origin = self._row._screen.get_width() / 2 - len(config) / 2 * size
+        first, last = self._row.visible(len(config), origin)
+        states = config.states(first, last)
+        x = origin + first * size
+        self._row.draw_colors([self._colors[state] for state in states], x)
+        self._row.draw_cells([self._letters.get(state) for state in states], x)
+
+class TapeView:
+    '''
+        Draws the cells of a Turing Machine tape around its head.
+    '''
+    SIZE = 25
+
+    def __init__(self, screen: pygame.Surface, font: pygame.font.Font, x: int = 385, y: int = 295):
+        self._screen = screen
+        self._glyphs = GlyphCache(font)
+        self._x = x
+        self._row = CellRow(screen, y, TapeView.SIZE)
+
+    def radius(self) -> int:
+        '''
+            Returns the number of cells visible on each side of the head.
+        '''
+        return max(self._x, self._screen.get_width() - self._x) // TapeView.SIZE + 1
+
+    def draw(self, symbols: list, head: int):
+        size = TapeView.SIZE
+        cells = [
+            self._glyphs.cell(symbol, (217, 167, 161), size, False, (5, 0)) if index == head else self._glyphs.cell(symbol, (0, 167, 161), size)
+            for index, symbol in enumerate(symbols)
+        ]
+        self._row.draw_cells(cells, self._x - head * size)
+
+    glyphs = property(lambda x: x._glyphs)
@@ -0,0 +1,120 @@
+import struct
+import sys
+import zlib
+
+from cellular_automata import CellularAutomaton, Config, ArrayConfig, check_generations, load_cellular_from_file
+
+WHITE = (255, 255, 255)
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_CHUNK_SIZE = 1 << 16 # Size of the compressed data of each IDAT chunk
+
+def palette(automaton: CellularAutomaton) -> dict:
+    '''
+        Returns the RGB bytes of each state of `automaton`, from its colors.
+    '''
+    colors = {}
+    for state in automaton.states:
+        color = automaton._colors.get(automaton._subtypes.get(state, state), WHITE)
+        colors[state] = bytes(color)
+    return colors
+
+def diagram_size(automaton: CellularAutomaton, config: Config, generations: int) -> tuple[int, int, int]:
+    '''
+        Runs `generations` steps on a copy of `config` and returns the height and
+        the width of the space-time diagram, and the position of its first column
+        relatively to the leftmost cell of `config`.
+    '''
+    check_generations(generations)
+    config = ArrayConfig.from_liste(config.states())
+    left = 0
+    for _ in range(generations):
+        if automaton.step(config)[0]:
+            left -= 1
+    return generations + 1, len(config), left
+
+def diagram_rows(automaton: CellularAutomaton, config: Config, generations: int, width: int, low: int):
+    '''
+        Yields the RGB bytes of each row of the space-time diagram, from the
+        generation 0 to `generations`. The cells are placed in `width` columns
+        starting at the position `low`, the columns out of the tape are blank.
+    '''
+    colors = palette(automaton)
+    blank = colors['Blank']
+    config = ArrayConfig.from_liste(config.states())
+    left = 0
+    for generation in range(generations + 1):
+        if generation > 0 and automaton.step(config)[0]:
+            left -= 1
+        row = b''.join(colors[state] for state in config.states())
+        yield blank * (left - low) + row + blank * (width - (left - low) - len(config))
+
+def export_array(automaton: CellularAutomaton, config: Config, generations: int, path: str):
+    '''
+        Writes the space-time diagram of `generations` steps of `config` in the
+        .npy file `path` as a uint8 array of shape (generations + 1, width, 3),
+        one row at a time through a memory map. Returns the memory-mapped array.
+    '''
+    from numpy.lib.format import open_memmap
+    import numpy as np
+
+    height, width, low = diagram_size(automaton, config, generations)
+    diagram = open_memmap(path, mode='w+', dtype=np.uint8, shape=(height, width, 3))
+    for index, row in enumerate(diagram_rows(automaton, config, generations, width, low)):
+        diagram[index] = np.frombuffer(row, dtype=np.uint8).reshape(width, 3)
+    diagram.flush()
+    return diagram
+
+def export_ppm(automaton: CellularAutomaton, config: Config, generations: int, path: str):
+    '''
+        Writes the space-time diagram of `generations` steps of `config` in the
+        binary PPM image `path`, streaming one row at a time.
+    '''
+    height, width, low = diagram_size(automaton, config, generations)
+    with open(path, 'wb') as stream:
+        stream.write(f'P6\n{width} {height}\n255\n'.encode())
+        for row in diagram_rows(automaton, config, generations, width, low):
+            stream.write(row)
+
+def _write_png_chunk(stream, kind: bytes, data: bytes):
+    stream.write(struct.pack('>I', len(data)))
+    stream.write(kind)
+    stream.write(data)
+    stream.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(kind))))
+
+def export_png(automaton: CellularAutomaton, config: Config, generations: int, path: str):
+    '''
+        Writes the space-time diagram of `generations` steps of `config` in the
+        PNG image `path`, compressing the rows as they come : the memory used
+        doesn't depend on the number of generations.
+    '''
+    height, width, low = diagram_size(automaton, config, generations)
+    with open(path, 'wb') as stream:
+        stream.write(PNG_SIGNATURE)
+        # 8 bits per channel, RGB, no interlacing
+        _write_png_chunk(stream, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+
+        compressor = zlib.compressobj()
+        pending = b''
+        for row in diagram_rows(automaton, config, generations, width, low):
+            pending += compressor.compress(b'\0' + row) # Filter type None
+            while len(pending) >= PNG_CHUNK_SIZE:
+                _write_png_chunk(stream, b'IDAT', pending[:PNG_CHUNK_SIZE])
+                pending = pending[PNG_CHUNK_SIZE:]
+        pending += compressor.flush()
+        _write_png_chunk(stream, b'IDAT', pending)
+        _write_png_chunk(stream, b'IEND', b'')
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if len(args) < 3:
+        print('usage : spacetime.py <script.cel> <generations> <output.png | output.ppm | output.npy>')
+        sys.exit(1)
+
+    automaton, config = load_cellular_from_file(args[0])
+    generations = int(args[1])
+    if args[2].endswith('.npy'):
+        export_array(automaton, config, generations, args[2])
+    elif args[2].endswith('.ppm'):
+        export_ppm(automaton, config, generations, args[2])
+    else:
+        export_png(automaton, config, generations, args[2])
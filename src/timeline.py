@@ -0,0 +1,243 @@
+from abc import ABC, abstractmethod
+from array import array
+
+from turing_machine import TuringMachine, State
+from cellular_automata import CellularAutomaton, Config
+
+class Timeline(ABC):
+    '''
+        Seekable history of a run : a full snapshot is kept every `interval`
+        steps and lightweight deltas in between, so that `seek` and `step_back`
+        cost O(interval) whatever the length of the run.
+        A small interval cost more memory, a large one slows down seeking.
+    '''
+    def __init__(self, interval: int):
+        if interval < 1:
+            raise ValueError(f'The interval between keyframes need to be positive, found : {interval}.')
+        self._interval = interval
+        self._keyframes = []
+        self._position = 0
+        self._frontier = 0   # Number of steps recorded
+        self._halted = False # The run can't go further than the frontier
+
+    @abstractmethod
+    def _forward(self) -> bool:
+        '''
+            Moves the cursor one step forward, simulating and recording
+            a new step at the frontier. Returns False if the run is over.
+        '''
+
+    @abstractmethod
+    def _backward(self):
+        '''
+            Moves the cursor one step backward by undoing its delta.
+        '''
+
+    @abstractmethod
+    def _load(self, index: int):
+        '''
+            Moves the cursor on the keyframe `index`.
+        '''
+
+    @abstractmethod
+    def _keyframe(self):
+        '''
+            Returns a snapshot of the configuration at the cursor.
+        '''
+
+    def _record_keyframe(self):
+        if self._frontier == len(self._keyframes) * self._interval:
+            self._keyframes.append(self._keyframe())
+
+    def seek(self, position: int) -> int:
+        '''
+            Moves the cursor on the step `position` (or on the last step if
+            the run halts before) and returns the new position.
+        '''
+        if position < 0:
+            raise ValueError(f'Can\'t seek a negative step : {position}.')
+
+        if position <= self._position:
+            if self._position - position <= self._interval:
+                while self._position > position:
+                    self._backward()
+                return self._position
+            self._load(position // self._interval)
+        elif min(position, self._frontier) - self._position > self._interval:
+            self._load(min(position, self._frontier) // self._interval)
+
+        while self._position < position and self._forward():
+            pass
+        return self._position
+
+    def run(self, count: int) -> int:
+        '''
+            Moves the cursor `count` steps forward.
+        '''
+        return self.seek(self._position + count)
+
+    def step_forward(self) -> int:
+        return self.seek(self._position + 1)
+
+    def step_back(self) -> int:
+        if self._position > 0:
+            self._backward()
+        return self._position
+
+    interval = property(lambda x: x._interval)
+    position = property(lambda x: x._position)
+    frontier = property(lambda x: x._frontier)
+    halted = property(lambda x: x._halted)
+
+
+class TuringTimeline(Timeline):
+    '''
+        Timeline of a Turing Machine run with its compiled tables. The
+        position counts the transitions applied from the configuration of `tm`.
+    '''
+    def __init__(self, tm: TuringMachine, interval: int = 4096):
+        super().__init__(interval)
+        self._tm = tm
+        self._start = tm.step
+        self._compiled, tape, self._state, self._tape_type = tm.compiled_configuration()
+        self._tape = tape.copy()
+        # For each step : the state before it << 18 | its move << 16 | the symbol it overwrote
+        self._deltas = array('Q')
+        self._record_keyframe()
+
+    def _keyframe(self):
+        return (self._tape.copy(), self._state)
+
+    def _load(self, index: int):
+        tape, self._state = self._keyframes[index]
+        self._tape = tape.copy()
+        self._position = index * self._interval
+
+    def _forward(self) -> bool:
+        if self._position == self._frontier and self._halted:
+            return False
+        tape = self._tape
+        entry = self._compiled.lookup(self._state, tape.symbol_id)
+        if entry is None:
+            self._halted = True
+            return False
+
+        write, move, state = entry
+        if self._position == self._frontier:
+            self._deltas.append(self._state << 18 | move << 16 | tape.symbol_id)
+        tape.set_symbol_id(write)
+        if move == 1:
+            tape.move_left()
+        elif move == 2:
+            tape.move_right()
+        self._state = state
+        self._position += 1
+        if self._position > self._frontier:
+            self._frontier = self._position
+            self._record_keyframe()
+        return True
+
+    def _backward(self):
+        delta = self._deltas[self._position - 1]
+        move = delta >> 16 & 3
+        if move == 1:
+            self._tape.move_right()
+        elif move == 2:
+            self._tape.move_left()
+        self._tape.set_symbol_id(delta & 0xFFFF)
+        self._state = delta >> 18
+        self._position -= 1
+
+    def configuration(self) -> tuple[list[str], int, State]:
+        '''
+            Returns the tape (from its leftmost visited cell), the index of the head
+            and the State at the cursor.
+        '''
+        symbols, head = self._tape.snapshot()
+        return symbols, head, self._compiled.states[self._state]
+
+    def restore(self):
+        '''
+            Writes the configuration at the cursor back into the Turing Machine.
+        '''
+        self._tm.restore_configuration(self._tape.copy(), self._state, self._tape_type)
+        self._tm.set_step(self._start + self._position)
+
+
+class CellularTimeline(Timeline):
+    '''
+        Timeline of a Cellular Automaton run, the position is the generation.
+        The deltas are the cells changed by each generation.
+    '''
+    def __init__(self, automaton: CellularAutomaton, config: Config, interval: int = 256):
+        super().__init__(interval)
+        self._automaton = automaton
+        self._frontier_config = Config.from_liste(config.states())
+        self._row = config.states()
+        self._left = 0 # Position of the leftmost cell
+        # For each generation : (grown on the left, grown on the right, ((index, old, new), ...))
+        self._deltas = []
+        self._record_keyframe()
+
+    def _keyframe(self):
+        return (list(self._row), self._left)
+
+    def _load(self, index: int):
+        row, self._left = self._keyframes[index]
+        self._row = list(row)
+        self._position = index * self._interval
+
+    def _simulate(self):
+        '''
+            Applies a new generation on the frontier configuration and records its delta.
+        '''
+        config = self._frontier_config
+        old_row = config.states()
+        left, right, _ = self._automaton.step(config)
+
+        changes = []
+        for index, state in enumerate(config.states()):
+            old_index = index - left
+            old = old_row[old_index] if 0 <= old_index < len(old_row) else 'Blank'
+            if state != old:
+                changes.append((index, old, state))
+        self._deltas.append((left, right, tuple(changes)))
+
+    def _forward(self) -> bool:
+        if self._position == self._frontier:
+            self._simulate()
+
+        left, right, changes = self._deltas[self._position]
+        if left:
+            self._row.insert(0, 'Blank')
+            self._left -= 1
+        if right:
+            self._row.append('Blank')
+        for index, _, new in changes:
+            self._row[index] = new
+
+        self._position += 1
+        if self._position > self._frontier:
+            self._frontier = self._position
+            self._record_keyframe()
+        return True
+
+    def _backward(self):
+        left, right, changes = self._deltas[self._position - 1]
+        for index, old, _ in changes:
+            self._row[index] = old
+        if right:
+            self._row.pop()
+        if left:
+            self._row.pop(0)
+            self._left += 1
+        self._position -= 1
+
+    def config(self) -> Config:
+        '''
+            Returns a copy of the configuration at the cursor.
+        '''
+        return Config.from_liste(self._row)
+
+    row = property(lambda x: list(x._row))
+    left = property(lambda x: x._left)
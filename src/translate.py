@@ -2,8 +2,21 @@ import sys
 import random
 from turing_machine import parser_tm_script
 from utils import letter_from_color, color_from_letter
+from cellular_automata import CellularAutomaton, Config
 
-def translate_turing_machine(script_path:str, save_path:str):
+TAPE_CLASS = "Tape" # Class of the cells without the head of the Turing Machine
+
+def check_tape_class(state:str, symbol:str):
+    """Raise a ValueError when the state of the Cellular Automaton made of a state and a symbol of the Turing Machine
+    is the name of the class of the tape cells : the class is declared beside the states, the rules would be ambiguous.
+    """
+    if f"{state}{symbol}" == TAPE_CLASS:
+        raise ValueError(f"The state '{TAPE_CLASS}' of the Cellular Automaton, made of the state '{state}' and the symbol '{symbol}' of the Turing Machine, is also the name of the class of the tape cells, rename the state '{state}'.")
+
+def read_turing_machine(script_path:str) -> tuple:
+    """Parse a Turing Machine script, returns its initial state, its finals states, its input word,
+    its transitions and its alphabet.
+    """
     buffer = {} # key : StateName_READ, value : a tuple that contains the FUTUR_STATE, WRITE, MOVEMENT values
     tm_alphabet = set() # Store the symbols used by the Cellular Automaton
     with open (script_path,"r") as fs:
@@ -16,6 +29,7 @@ def translate_turing_machine(script_path:str, save_path:str):
             if line != "" and not line.startswith("//"):
                 try:
                     current_state, read, futur_state, write, move = line.strip().split(",")
+                    check_tape_class(current_state, read) ; check_tape_class(futur_state, read)
                     tm_alphabet.add(read) ; tm_alphabet.add(write)
                     buffer[f"{current_state}{read}"] = (futur_state,write,move)
 
@@ -25,86 +39,106 @@ def translate_turing_machine(script_path:str, save_path:str):
                 except Exception as error:
                     print(f"Error line :\n'{line}'\n")
                     raise error
+    return (init_state, finals, input_word, buffer, tm_alphabet)
 
-    # Store the alphabet of the CellularAutomaton -> {TM_transitions U {*}} x tm_alphabet
-    ca_alphabet = set()
+class Translation:
+    """This class represent the Cellular Automaton simulating a Turing Machine, before it is built or written."""
 
-    # Generate the CA alphabet based on the finals states and the TM alphabet
-    for state in finals:
-        for letter in tm_alphabet:
-            ca_alphabet.add(f"{state}{letter}")
-            ca_alphabet.add(f"{init_state}{letter}")
-
-    # Adding already formatted states stored in the buffer
-    for state in buffer.keys():
-        ca_alphabet.add(state)
-
-    # Adding empty state for each letter in the TM alphabet
-    for letter in tm_alphabet:
-        ca_alphabet.add(f"*{letter}")
-
-    # transitions store the transitions of the CellularAutomaton in this format : key : (CELL_Left, cell_middle, CELL_Right), value: New_CELL
-    transitions = dict()
-    cell_without_state = {letter for letter in ca_alphabet if letter[0]=="*"} # Store all the cell alphabet that hasn't got transitions
-    for state, transition in buffer.items():
-        futur_state, write, move = transition
-        match move:
-            case "-":
-                for cell_left in cell_without_state:
-                    for cell_right in cell_without_state:
-                        transitions[(cell_left,state,cell_right)] = f"{futur_state}{write}"
-            case ">":
-                for cell_left in cell_without_state:
-                    for cell_right in cell_without_state:
-                        transitions[(cell_left,state,cell_right)] = f"*{write}"
-                for current_cell in cell_without_state:
-                    for cell_right in cell_without_state:
-                        transitions[(state,current_cell,cell_right)] = f"{futur_state}{current_cell[1:]}"
-            case "<":
-                for cell_left in cell_without_state:
-                    for cell_right in cell_without_state:
-                        transitions[(cell_left,state,cell_right)] = f"*{write}"
-                for current_cell in cell_without_state:
-                    for cell_left in cell_without_state:
-                        transitions[(cell_left,current_cell,state)] = f"{futur_state}{current_cell[1:]}"
-            case default:
-                print(f"Inconsistent symbol for movement : '{move}'")
+    def __init__(self, init_state:str, finals:list[str], input_word:list[str], buffer:dict, tm_alphabet:set):
+        # Store the alphabet of the CellularAutomaton -> {TM_transitions U {*}} x tm_alphabet
+        ca_alphabet = set()
 
-    # Store the colors of each state
-    colors = set() 
-    generated = []
-    for index, value in enumerate(ca_alphabet):
+        # Generate the CA alphabet based on the finals states and the TM alphabet
+        for state in finals:
+            for letter in tm_alphabet:
+                check_tape_class(state, letter) ; check_tape_class(init_state, letter)
+                ca_alphabet.add(f"{state}{letter}")
+                ca_alphabet.add(f"{init_state}{letter}")
 
-        r, g, b = color_from_letter(value[-1])
+        # Adding already formatted states stored in the buffer
+        for state in buffer.keys():
+            ca_alphabet.add(state)
 
-        colors.add((value, r, g, b))
-    
-    with open(save_path,"w")  as fd:
-        content = ""
-        
-        content += "Colors:\n"
-        for color in colors:
-            content += f"   Color{color[0]} <- {color[1],color[2],color[3]},\n"
-        content = content[:-2] + '\n' # Deleting last comma
-
-        content += "\nStates:\n"
-        for state in ca_alphabet:
-            content += f"   {state}(Color{state}),\n"
-        content = content[:-2] + '\n' # Deleting last comma
-
-        content += "\nTransitions:\n"
-        for cells, new_cell in transitions.items():
-            cell_left, cell_middle, cell_right = cells
-            content += f"   ({cell_left}, {cell_middle}, {cell_right}) -> {new_cell},\n"
-        content = content[:-2] + '\n' # Deleting last comma
-
-        content += f"\nInitialisation:\n   *_, *_, {init_state}{input_word[0]},"
-        for word in input_word[1:]:
-            content += f" *{word},"
-        content += f' *_, *_\n'
-
-        fd.write(content)
+        # Adding empty state for each letter in the TM alphabet
+        for letter in tm_alphabet:
+            ca_alphabet.add(f"*{letter}")
+
+        # transitions store the transitions of the CellularAutomaton in this format : key : (CELL_Left, cell_middle, CELL_Right), value: New_CELL
+        # The neighbours without state are matched by the class TAPE_CLASS instead of listing every pair of them
+        transitions = dict()
+        cell_without_state = sorted(letter for letter in ca_alphabet if letter[0]=="*") # Store all the cell alphabet that hasn't got transitions
+        for state, transition in buffer.items():
+            futur_state, write, move = transition
+            check_tape_class(futur_state, write)
+            if move in ("<", ">"):
+                for current_cell in cell_without_state:
+                    check_tape_class(futur_state, current_cell[1:])
+            match move:
+                case "-":
+                    transitions[(TAPE_CLASS,state,TAPE_CLASS)] = f"{futur_state}{write}"
+                case ">":
+                    transitions[(TAPE_CLASS,state,TAPE_CLASS)] = f"*{write}"
+                    for current_cell in cell_without_state:
+                        transitions[(state,current_cell,TAPE_CLASS)] = f"{futur_state}{current_cell[1:]}"
+                case "<":
+                    transitions[(TAPE_CLASS,state,TAPE_CLASS)] = f"*{write}"
+                    for current_cell in cell_without_state:
+                        transitions[(TAPE_CLASS,current_cell,state)] = f"{futur_state}{current_cell[1:]}"
+                case default:
+                    print(f"Inconsistent symbol for movement : '{move}'")
+
+        self._states = tuple(sorted(ca_alphabet))
+        # Store the colors of each state
+        self._colors = {f"Color{state}": color_from_letter(state[-1]) for state in self._states}
+        self._classes = {TAPE_CLASS: tuple(cell_without_state)}
+        self._transitions = transitions
+        self._initialisation = ["*_", "*_", f"{init_state}{input_word[0]}"] + [f"*{word}" for word in input_word[1:]] + ["*_", "*_"]
+
+    def from_script(script_path:str) -> 'Translation':
+        return Translation(*read_turing_machine(script_path))
+
+    def automaton(self, config_type:type=Config) -> tuple[CellularAutomaton, Config]:
+        """Build the Cellular Automaton and its initial configuration directly, without writing and parsing a .cel file."""
+        colors = dict(self._colors)
+        colors["Blank"] = (255, 255, 255)
+        automaton = CellularAutomaton(self._states + ("Blank",), {state: f"Color{state}" for state in self._states}, colors)
+        for name, states in self._classes.items():
+            automaton._rules.add_class(name, states)
+        for cells, new_cell in self._transitions.items():
+            automaton._rules.set(cells, new_cell)
+        return (automaton, config_type.from_liste(self._initialisation))
+
+    def write(self, fd):
+        """Write the Cellular Automaton in the .cel format on the text stream 'fd', one entry at a time."""
+        def write_field(title:str, entries):
+            fd.write(f"{title}:\n")
+            separator = ""
+            for entry in entries:
+                fd.write(f"{separator}   {entry}")
+                separator = ",\n"
+            fd.write("\n")
+
+        write_field("Colors", (f"{name} <- {color}" for name, color in self._colors.items()))
+        fd.write("\n")
+        write_field("States", (f"{state}(Color{state})" for state in self._states))
+        fd.write("\n")
+        write_field("Classes", (f"{name} <- ({', '.join(states)})" for name, states in self._classes.items()))
+        fd.write("\n")
+        write_field("Transitions", (f"({cell_left}, {cell_middle}, {cell_right}) -> {new_cell}" for (cell_left, cell_middle, cell_right), new_cell in self._transitions.items()))
+        fd.write("\n")
+        fd.write(f"Initialisation:\n   {', '.join(self._initialisation)}\n")
+
+    states = property(lambda x: x._states)
+    transitions = property(lambda x: x._transitions)
+
+def translate_turing_machine(script_path:str, save_path:str):
+    with open(save_path,"w") as fd:
+        Translation.from_script(script_path).write(fd)
     print("Successfully translate The Turing Machine into a Cellular Automaton.")
+
+def translate_to_automaton(script_path:str, config_type:type=Config) -> tuple[CellularAutomaton, Config]:
+    """Translate a Turing Machine script into a ready to run Cellular Automaton and its initial configuration."""
+    return Translation.from_script(script_path).automaton(config_type)
     
 
 def generate_color(n:int) -> tuple[int,int,int]:
@@ -1,5 +1,10 @@
 from io import TextIOWrapper
-import pygame
+from array import array
+import codecs
+import hashlib
+import math
+import mmap
+import os
 import sys
 
 class Symbol:
@@ -112,6 +117,36 @@ class State:
     transitions = property(lambda x: x._transitions,set_transitions)
     final = property(lambda x: x._final,set_final)  
 
+class Alphabet:
+    """This class intern the symbols of a TM as small integers, the blank symbol '_' is always 0."""
+
+    def __init__(self, symbols:tuple[str, ...]=()):
+        self._symbols = ["_"]
+        self._ids = {"_": 0}
+        for symbol in symbols:
+            self.intern(symbol)
+
+    def intern(self, symbol:str) -> int:
+        """Return the id of the symbol, an unknown symbol receive the next free id."""
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = len(self._symbols)
+            self._symbols.append(symbol)
+            self._ids[symbol] = symbol_id
+        return symbol_id
+
+    def __getitem__(self, symbol_id:int) -> str:
+        return self._symbols[symbol_id]
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __repr__(self):
+        return f"Alphabet : {self._symbols}"
+
+    symbols = property(lambda x: x._symbols)
+    ids = property(lambda x: x._ids)
+
 class Tape:
     """This class represent the tape of a TM."""
 
@@ -134,19 +169,29 @@ class Tape:
 
     def from_liste(liste:list['str']) -> 'Tape':
         """Create a new Tape object from a list of str."""
-        tape = Tape(None,None)
-        if len(liste)>0:
-            symbol = Symbol(liste.pop(0))
-            tape.set_symbol(symbol)
-            right_tape = Tape.from_liste(liste)
-            right_tape.set_left(tape)
-            tape.set_right(right_tape)
-            left_tape = Tape(None,tape)
-            tape.set_left(left_tape)
-            return tape
-        else:
-            return tape
-        
+        return Tape.from_iterable(liste)
+
+    def from_iterable(symbols, head:int=0) -> 'Tape':
+        """Create a new Tape object from any iterable of str in linear time, the head is on the symbol of index head."""
+        first = Tape(None,None)
+        tape = first
+        current = None
+        for index, symbol in enumerate(symbols):
+            if current is None:
+                current = first
+            else:
+                current = current.move_right()
+            current.set_symbol(Symbol(symbol))
+            if index == head:
+                tape = current
+        if current is not None:
+            # Like the recursive construction, the input is surrounded by a blank cell on each side
+            current.move_right()
+            first.move_left()
+        if head != 0 and tape is first:
+            raise ValueError(f"The head {head} is outside of the tape.")
+        return tape
+
     def move_left(self) -> 'Tape':
         """Return the Tape object on the left of the current Tape object."""
         if isinstance(self._left, Tape):
@@ -165,6 +210,22 @@ class Tape:
             self.set_right(new_tape)
             return new_tape
         
+    def snapshot(self, radius:int=None) -> tuple[list[str],int]:
+        """Return the symbols from the leftmost to the rightmost cell and the index of the current cell.\n
+        With a radius, only the cells at most radius cells away from the current cell are returned.
+        """
+        leftmost = self
+        head = 0
+        while leftmost._left is not None and (radius is None or head < radius):
+            leftmost = leftmost._left
+            head += 1
+        symbols = []
+        current = leftmost
+        while current is not None and (radius is None or len(symbols) <= head + radius):
+            symbols.append(current._symbol.sym)
+            current = current._right
+        return symbols, head
+
     def repr_left(self):
         if self._left == None : return ""
         else : return f"|{self._left.repr_left()}|{self._left.symbol}".removeprefix("||")
@@ -181,15 +242,317 @@ class Tape:
     left = property(lambda x: x._left,set_left)
     right = property(lambda x: x._right,set_right)
 
+class ArrayTape:
+    """This class represent the tape of a TM as a contiguous buffer of symbol ids with a head offset.\n
+    It offer the same interface than 'Tape' : 'move_left' and 'move_right' return the tape itself
+    after moving the head, and the buffer grow at both ends with an amortized O(1) cost.
+    """
+
+    MIN_CAPACITY = 16
+
+    def __init__(self, alphabet:Alphabet=None):
+        assert alphabet is None or isinstance(alphabet,Alphabet), "ERROR : The alphabet of an 'ArrayTape' need to be an 'Alphabet'"
+        self._alphabet = Alphabet() if alphabet is None else alphabet
+        self._cells = array("H", bytes(2 * ArrayTape.MIN_CAPACITY)) # The blank symbol has the id 0
+        self._head = ArrayTape.MIN_CAPACITY // 2
+        # Bounds of the cells already visited, like the nodes created by 'Tape'
+        self._low = self._head
+        self._high = self._head
+
+    def from_liste(liste:list[str], alphabet:Alphabet=None) -> 'ArrayTape':
+        """Create a new ArrayTape object from a list of str, the head is on the first symbol."""
+        return ArrayTape.from_iterable(liste, alphabet)
+
+    def from_iterable(symbols, alphabet:Alphabet=None, head:int=0) -> 'ArrayTape':
+        """Create a new ArrayTape object from any iterable of str in linear time, the head is on the symbol of index head."""
+        tape = ArrayTape(alphabet)
+        cells = tape._cells
+        del cells[tape._head:]
+        intern = tape._alphabet.intern
+        for symbol in symbols:
+            cells.append(intern(symbol))
+        tape._high = max(len(cells) - 1, tape._head)
+        cells.frombytes(bytes(2 * ArrayTape.MIN_CAPACITY))
+        if not 0 <= head <= tape._high - tape._low:
+            raise ValueError(f"The head {head} is outside of the tape.")
+        tape._head += head
+        return tape
+
+    def _grow_left(self) -> int:
+        """Prepend blank cells to the buffer and return the number of cells added."""
+        added = max(len(self._cells), ArrayTape.MIN_CAPACITY)
+        self._cells[0:0] = array("H", bytes(2 * added))
+        self._head += added
+        self._low += added
+        self._high += added
+        return added
+
+    def _grow_right(self) -> int:
+        """Append blank cells to the buffer and return the number of cells added."""
+        added = max(len(self._cells), ArrayTape.MIN_CAPACITY)
+        self._cells.frombytes(bytes(2 * added))
+        return added
+
+    def copy(self) -> 'ArrayTape':
+        """Return an independent copy of the tape, that share the same alphabet."""
+        tape = ArrayTape(self._alphabet)
+        tape._cells = array("H", self._cells)
+        tape._head, tape._low, tape._high = self._head, self._low, self._high
+        return tape
+
+    def fingerprint(self) -> tuple[int,bytes]:
+        """Return the position of the head relative to the first non blank cell and the symbol ids
+        between the first and the last non blank cells, both don't depend on where the word is on the tape.
+        """
+        written = self._cells[self._low:self._high + 1].tobytes()
+        first = (len(written) - len(written.lstrip(b"\0"))) // 2
+        last = (len(written.rstrip(b"\0")) + 1) // 2
+        if last <= first:
+            return 0, b""
+        return self._head - self._low - first, written[2 * first:2 * last]
+
+    def rebind(self, alphabet:Alphabet):
+        """Translate the symbol ids of the tape into the ids of another alphabet."""
+        assert isinstance(alphabet,Alphabet), "ERROR : The alphabet of an 'ArrayTape' need to be an 'Alphabet'"
+        if alphabet is not self._alphabet:
+            translation = [alphabet.intern(symbol) for symbol in self._alphabet.symbols]
+            self._cells = array("H", (translation[symbol] for symbol in self._cells))
+            self._alphabet = alphabet
+
+    def set_symbol(self, new_symbol:Symbol):
+        assert isinstance(new_symbol,Symbol), "ERROR : The symbol of an 'ArrayTape' need to be a 'Symbol'"
+        self._cells[self._head] = self._alphabet.intern(new_symbol.sym)
+
+    def set_symbol_id(self, new_symbol_id:int):
+        self._cells[self._head] = new_symbol_id
+
+    def move_left(self) -> 'ArrayTape':
+        """Move the head on the left cell and return the tape."""
+        if self._head == 0:
+            self._grow_left()
+        self._head -= 1
+        self._low = min(self._low, self._head)
+        return self
+
+    def move_right(self) -> 'ArrayTape':
+        """Move the head on the right cell and return the tape."""
+        if self._head == len(self._cells) - 1:
+            self._grow_right()
+        self._head += 1
+        self._high = max(self._high, self._head)
+        return self
+
+    def snapshot(self, radius:int=None) -> tuple[list[str],int]:
+        """Return the symbols from the leftmost to the rightmost visited cell and the index of the current cell.\n
+        With a radius, only the cells at most radius cells away from the current cell are returned.
+        """
+        symbols = self._alphabet.symbols
+        low, high = self._low, self._high
+        if radius is not None:
+            low, high = max(low, self._head - radius), min(high, self._head + radius)
+        return [symbols[cell] for cell in self._cells[low:high + 1]], self._head - low
+
+    def __repr__(self):
+        symbols, head = self.snapshot()
+        return f"{'|'.join(symbols[:head])}|> {symbols[head]} <|{'|'.join(symbols[head + 1:])}"
+
+    symbol = property(lambda x: Symbol(x._alphabet[x._cells[x._head]]),set_symbol)
+    symbol_id = property(lambda x: x._cells[x._head],set_symbol_id)
+    alphabet = property(lambda x: x._alphabet)
+
+class RunLengthTape:
+    """This class represent the tape of a TM as runs of identical symbol ids, with the head given by
+    the index of its run and its offset in the run.
+
+    It offer the same interface than 'ArrayTape', the memory used depend on the number of runs
+    instead of the number of cells, and the compiled TM can sweep over a whole run at once.
+    """
+
+    def __init__(self, alphabet:Alphabet=None):
+        assert alphabet is None or isinstance(alphabet,Alphabet), "ERROR : The alphabet of a 'RunLengthTape' need to be an 'Alphabet'"
+        self._alphabet = Alphabet() if alphabet is None else alphabet
+        # Like 'ArrayTape', the runs cover the cells already visited
+        self._runs = [0] # The blank symbol has the id 0
+        self._lengths = [1]
+        self._run = 0
+        self._offset = 0
+
+    def from_liste(liste:list[str], alphabet:Alphabet=None) -> 'RunLengthTape':
+        """Create a new RunLengthTape object from a list of str, the head is on the first symbol."""
+        return RunLengthTape.from_iterable(liste, alphabet)
+
+    def from_iterable(symbols, alphabet:Alphabet=None, head:int=0) -> 'RunLengthTape':
+        """Create a new RunLengthTape object from any iterable of str in linear time, the head is on the symbol of index head."""
+        tape = RunLengthTape(alphabet)
+        runs, lengths = [], []
+        intern = tape._alphabet.intern
+        count = 0
+        for symbol in symbols:
+            symbol_id = intern(symbol)
+            if runs and runs[-1] == symbol_id:
+                lengths[-1] += 1
+            else:
+                runs.append(symbol_id)
+                lengths.append(1)
+            count += 1
+        if runs:
+            tape._runs, tape._lengths = runs, lengths
+        if not 0 <= head < max(count, 1):
+            raise ValueError(f"The head {head} is outside of the tape.")
+        while head >= tape._lengths[tape._run]:
+            head -= tape._lengths[tape._run]
+            tape._run += 1
+        tape._offset = head
+        return tape
+
+    def copy(self) -> 'RunLengthTape':
+        """Return an independent copy of the tape, that share the same alphabet."""
+        tape = RunLengthTape(self._alphabet)
+        tape._runs, tape._lengths = list(self._runs), list(self._lengths)
+        tape._run, tape._offset = self._run, self._offset
+        return tape
+
+    def rebind(self, alphabet:Alphabet):
+        """Translate the symbol ids of the tape into the ids of another alphabet."""
+        if alphabet is not self._alphabet:
+            translation = [alphabet.intern(symbol) for symbol in self._alphabet.symbols]
+            self._runs = [translation[symbol] for symbol in self._runs]
+            self._alphabet = alphabet
+
+    def _splice(self, run:int, start:int, end:int, symbol_id:int) -> tuple[int,int]:
+        """Write symbol_id on the cells from start to end (excluded) of a run, merging the equal runs.
+
+        Return the index of the run and the offset of the cell start.
+        """
+        runs, lengths = self._runs, self._lengths
+        current, length = runs[run], lengths[run]
+        if current == symbol_id:
+            return run, start
+        parts, part_lengths = [symbol_id], [end - start]
+        if start > 0:
+            parts.insert(0, current)
+            part_lengths.insert(0, start)
+        if end < length:
+            parts.append(current)
+            part_lengths.append(length - end)
+        runs[run:run + 1] = parts
+        lengths[run:run + 1] = part_lengths
+        run += start > 0
+        offset = 0
+        if run + 1 < len(runs) and runs[run + 1] == symbol_id:
+            lengths[run] += lengths[run + 1]
+            del runs[run + 1], lengths[run + 1]
+        if run > 0 and runs[run - 1] == symbol_id:
+            offset = lengths[run - 1]
+            lengths[run - 1] += lengths[run]
+            del runs[run], lengths[run]
+            run -= 1
+        return run, offset
+
+    def _place(self, run:int, offset:int):
+        """Put the head on the cell at offset of a run, the offset being at most one cell out of the run."""
+        runs, lengths = self._runs, self._lengths
+        if offset < 0:
+            if run > 0:
+                run -= 1
+                offset = lengths[run] - 1
+            elif runs[0] == 0:
+                lengths[0] += 1
+                offset = 0
+            else:
+                runs.insert(0, 0)
+                lengths.insert(0, 1)
+                offset = 0
+        elif offset == lengths[run]:
+            if run + 1 < len(runs):
+                run += 1
+                offset = 0
+            elif runs[run] == 0:
+                lengths[run] += 1
+            else:
+                runs.append(0)
+                lengths.append(1)
+                run += 1
+                offset = 0
+        self._run, self._offset = run, offset
+
+    def set_symbol(self, new_symbol:Symbol):
+        assert isinstance(new_symbol,Symbol), "ERROR : The symbol of a 'RunLengthTape' need to be a 'Symbol'"
+        self.set_symbol_id(self._alphabet.intern(new_symbol.sym))
+
+    def set_symbol_id(self, new_symbol_id:int):
+        self._run, self._offset = self._splice(self._run, self._offset, self._offset + 1, new_symbol_id)
+
+    def sweep(self, count:int, symbol_id:int, move:int):
+        """Write symbol_id on count cells of the run of the head, starting from the head in the direction
+        of the move (a value of 'MoveTo'), and put the head on the next cell in that direction.
+        """
+        if move == 1:
+            run, offset = self._splice(self._run, self._offset - count + 1, self._offset + 1, symbol_id)
+            self._place(run, offset - 1)
+        elif move == 2:
+            run, offset = self._splice(self._run, self._offset, self._offset + count, symbol_id)
+            self._place(run, offset + count)
+        else:
+            self._run, self._offset = self._splice(self._run, self._offset, self._offset + 1, symbol_id)
+
+    def move_left(self) -> 'RunLengthTape':
+        """Move the head on the left cell and return the tape."""
+        self._place(self._run, self._offset - 1)
+        return self
+
+    def move_right(self) -> 'RunLengthTape':
+        """Move the head on the right cell and return the tape."""
+        self._place(self._run, self._offset + 1)
+        return self
+
+    def snapshot(self, radius:int=None) -> tuple[list[str],int]:
+        """Return the symbols from the leftmost to the rightmost visited cell and the index of the current cell.\n
+        With a radius, only the cells at most radius cells away from the current cell are returned.
+        """
+        symbols = self._alphabet.symbols
+        runs, lengths = self._runs, self._lengths
+        if radius is None:
+            cells = []
+            for symbol_id, length in zip(runs, lengths):
+                cells.extend([symbols[symbol_id]] * length)
+            return cells, sum(lengths[:self._run]) + self._offset
+
+        # Only the runs within radius cells of the head are walked
+        left = [symbols[runs[self._run]]] * min(self._offset, radius) # From the head to the left
+        run = self._run - 1
+        while run >= 0 and len(left) < radius:
+            left.extend([symbols[runs[run]]] * min(lengths[run], radius - len(left)))
+            run -= 1
+        left.reverse()
+        right = [symbols[runs[self._run]]] * min(lengths[self._run] - self._offset, radius + 1)
+        run = self._run + 1
+        while run < len(runs) and len(right) <= radius:
+            right.extend([symbols[runs[run]]] * min(lengths[run], radius + 1 - len(right)))
+            run += 1
+        return left + right, len(left)
+
+    def runs(self) -> list[tuple[str,int]]:
+        """Return the runs (symbol, length) from the leftmost to the rightmost visited cell."""
+        return [(self._alphabet[symbol_id], length) for symbol_id, length in zip(self._runs, self._lengths)]
+
+    def __repr__(self):
+        symbols, head = self.snapshot()
+        return f"{'|'.join(symbols[:head])}|> {symbols[head]} <|{'|'.join(symbols[head + 1:])}"
+
+    symbol = property(lambda x: Symbol(x._alphabet[x._runs[x._run]]),set_symbol)
+    symbol_id = property(lambda x: x._runs[x._run],set_symbol_id)
+    alphabet = property(lambda x: x._alphabet)
+
 class Configuration:
     """This class represent the configuration of a TM, that include the tape and the current state."""
 
-    def __init__(self, tape:Tape, current_state:State):
+    def __init__(self, tape:Tape | ArrayTape, current_state:State):
         self._tape = tape
         self._current_state = current_state
 
-    def set_tape(self,new_tape:Tape):
-        assert isinstance(new_tape,Tape), "ERROR : The 'Configuration' property 'tape' need to be a 'Tape' object."
+    def set_tape(self,new_tape:Tape | ArrayTape | RunLengthTape):
+        assert isinstance(new_tape,(Tape,ArrayTape,RunLengthTape)), "ERROR : The 'Configuration' property 'tape' need to be a 'Tape', an 'ArrayTape' or a 'RunLengthTape' object."
         self._tape = new_tape
 
     def set_current_state(self,new_current_state:State):
@@ -220,15 +583,236 @@ class Configuration:
     tape = property(lambda x: x._tape,set_tape)
     current_state = property(lambda x: x._current_state,set_current_state)
 
+class CompiledTuringMachine:
+    """This class represent the transitions of a TM compiled into integer lookup tables.\n
+    States and symbols are interned as small integers and each state id own a row
+    that map a symbol id to a tuple (write_id, move, next_state_id), the move use the values of 'MoveTo'.
+    """
+
+    def __init__(self, init_state:State):
+        assert isinstance(init_state,State), "ERROR : A CompiledTuringMachine take in input of it constructor a State object."
+        self._alphabet = Alphabet()
+        self._states = []
+        self._state_ids = {} # key : id of the State object, value : state id
+
+        # Breadth first walk through the object graph, the init state get the id 0
+        self._intern_state(init_state)
+        index = 0
+        while index < len(self._states):
+            for transition in self._states[index].transitions:
+                self._alphabet.intern(transition.read.sym)
+                self._alphabet.intern(transition.write.sym)
+                self._intern_state(transition.futur_state)
+            index += 1
+
+        self._width = len(self._alphabet)
+        self._symbols = [Symbol(symbol) for symbol in self._alphabet.symbols]
+        self._finals = [state.final for state in self._states]
+        self._rows = []
+        for state in self._states:
+            row = [None] * self._width
+            for transition in state.transitions:
+                read = self._alphabet.ids[transition.read.sym]
+                # Like in 'Configuration.update' the first matching transition is the one applied
+                if row[read] is None:
+                    write = self._alphabet.ids[transition.write.sym]
+                    row[read] = (write, transition.movement.move, self._state_ids[id(transition.futur_state)])
+            self._rows.append(row)
+
+    def _intern_state(self, state:State):
+        if id(state) not in self._state_ids:
+            self._state_ids[id(state)] = len(self._states)
+            self._states.append(state)
+
+    def state_id(self, state:State) -> int | None:
+        """Return the id of a State object, or None if the State isn't part of the compiled TM."""
+        return self._state_ids.get(id(state))
+
+    def lookup(self, state:int, symbol:int) -> tuple[int,int,int] | None:
+        """Return the entry (write_id, move, next_state_id) of the table, or None if there is no transition."""
+        if symbol < self._width:
+            return self._rows[state][symbol]
+        return None
+
+    def execute(self, tape:Tape | ArrayTape | RunLengthTape, state:int, step:int, limit:int | None = None) -> tuple[Tape | ArrayTape | RunLengthTape,int,int,bool]:
+        """Run the compiled TM from the given tape, state id and step, while there is transitions
+        and the limit of step isn't reached.\n
+        It count the steps exactly like 'TuringMachine.run' and return the tuple (tape, state_id, step, halted).
+        """
+        if limit is None:
+            limit = math.inf
+        if isinstance(tape, ArrayTape):
+            return self._execute_array(tape, state, step, limit)
+        if isinstance(tape, RunLengthTape):
+            return self._execute_runs(tape, state, step, limit)
+
+        rows = self._rows
+        ids = self._alphabet.ids
+        symbols = self._symbols
+        width = self._width
+        while step < limit:
+            step += 1
+            read = ids.get(tape._symbol._sym)
+            entry = rows[state][read] if read is not None and read < width else None
+            if entry is None:
+                return tape, state, step, True
+            write, move, state = entry
+            tape._symbol = symbols[write]
+            if move == 1:
+                tape = tape.move_left()
+            elif move == 2:
+                tape = tape.move_right()
+        return tape, state, step, False
+
+    def _execute_array(self, tape:ArrayTape, state:int, step:int, limit:int | float) -> tuple[ArrayTape,int,int,bool]:
+        """Same as 'execute' but directly on the symbol ids of an ArrayTape."""
+        tape.rebind(self._alphabet)
+        rows = self._rows
+        width = self._width
+        cells = tape._cells
+        head, low, high = tape._head, tape._low, tape._high
+        halted = False
+        while step < limit:
+            step += 1
+            read = cells[head]
+            entry = rows[state][read] if read < width else None
+            if entry is None:
+                halted = True
+                break
+            write, move, state = entry
+            cells[head] = write
+            if move == 1:
+                if head == 0:
+                    added = tape._grow_left() # 'cells' is grown in place
+                    head, low, high = head + added, low + added, high + added
+                head -= 1
+                if head < low:
+                    low = head
+            elif move == 2:
+                if head == len(cells) - 1:
+                    tape._grow_right()
+                head += 1
+                if head > high:
+                    high = head
+        tape._head, tape._low, tape._high = head, low, high
+        return tape, state, step, halted
+
+    def _execute_runs(self, tape:RunLengthTape, state:int, step:int, limit:int | float) -> tuple[RunLengthTape,int,int,bool]:
+        """Same as 'execute' on the runs of a RunLengthTape.\n
+        A transition that loop on its state and move the head apply on every cell of the run in
+        the direction of the move, so the whole run is swept in a single operation.
+        """
+        tape.rebind(self._alphabet)
+        rows = self._rows
+        width = self._width
+        while step < limit:
+            read = tape._runs[tape._run]
+            entry = rows[state][read] if read < width else None
+            if entry is None:
+                return tape, state, step + 1, True
+            write, move, next_state = entry
+            count = 1
+            if next_state == state and move != 0:
+                count = tape._offset + 1 if move == 1 else tape._lengths[tape._run] - tape._offset
+                count = min(count, limit - step)
+            tape.sweep(count, write, move)
+            state = next_state
+            step += count
+        return tape, state, step, False
+
+    def _fingerprint(self, tape:ArrayTape, state:int, memory:int) -> tuple:
+        """Fingerprint of a configuration, the symbols are replaced by a digest when they need more than memory bytes."""
+        head, written = tape.fingerprint()
+        if len(written) > memory:
+            written = hashlib.blake2b(written, digest_size=16).digest()
+        return state, head, len(written), written
+
+    def execute_detect(self, tape:ArrayTape, state:int, step:int, limit:int | None = None, memory:int = 1 << 20) -> tuple[ArrayTape,int,int,bool,'Cycle']:
+        """Same as 'execute' on an ArrayTape, but stop as soon as the configurations are found to cycle.\n
+        The cycles are detected with the algorithm of Brent, that only keep one fingerprint of configuration :
+        at most memory bytes of symbols, or a 16 bytes digest when the written region is larger.
+        Return the tuple (tape, state_id, step, halted, cycle) where cycle is a Cycle object or None.
+        """
+        if limit is None:
+            limit = math.inf
+        tape.rebind(self._alphabet)
+        start, start_state, start_step = tape.copy(), state, step
+
+        saved = self._fingerprint(tape, state, memory)
+        saved_step = step
+        power = 1
+        while step < limit:
+            tape, state, step, halted = self._execute_array(tape, state, step, step + 1)
+            if halted:
+                return tape, state, step, True, None
+            if state == saved[0] and self._fingerprint(tape, state, memory) == saved:
+                period = step - saved_step
+                return tape, state, step, False, Cycle(period, self._cycle_start(start, start_state, start_step, period))
+            if step - saved_step == power:
+                saved = self._fingerprint(tape, state, memory)
+                saved_step = step
+                power *= 2
+        return tape, state, step, False, None
+
+    def _cycle_start(self, tape:ArrayTape, state:int, step:int, period:int) -> int:
+        """Run again from the starting configuration to find the first step of the cycle."""
+        ahead, ahead_state, ahead_step, _ = self._execute_array(tape.copy(), state, step, step + period)
+        while state != ahead_state or tape.fingerprint() != ahead.fingerprint():
+            tape, state, step, _ = self._execute_array(tape, state, step, step + 1)
+            ahead, ahead_state, ahead_step, _ = self._execute_array(ahead, ahead_state, ahead_step, ahead_step + 1)
+        return step
+
+    def __getstate__(self):
+        """The State objects aren't pickled : a copy sent to another process only keeps the tables."""
+        state = self.__dict__.copy()
+        state["_states"] = []
+        state["_state_ids"] = {}
+        return state
+
+    def __repr__(self):
+        return f"CompiledTuringMachine -- {len(self._finals)} states ; {self._alphabet}"
+
+    alphabet = property(lambda x: x._alphabet)
+    states = property(lambda x: x._states)
+    finals = property(lambda x: x._finals)
+    rows = property(lambda x: x._rows)
+
+# Outcomes of a run
+ACCEPT = "ACCEPT"
+REJECT = "REJECT"
+TIMEOUT = "TIMEOUT"
+CYCLE = "CYCLE"
+
+class Cycle:
+    """This class represent the outcome of a TM that never halts : from the step start, its configuration
+    come back every period steps (up to a translation of the whole tape).
+    """
+
+    def __init__(self, period:int, start:int):
+        self._period = period
+        self._start = start
+
+    def __eq__(self, value):
+        return isinstance(value,Cycle) and self._period == value.period and self._start == value.start
+
+    def __repr__(self):
+        return f"cycles with period {self._period} starting at step {self._start}"
+
+    period = property(lambda x: x._period)
+    start = property(lambda x: x._start)
+
 class TuringMachine:
     """This class represent Turing Machine (TM)."""
 
     def __init__(self, configuration:Configuration):
         self._configuration = configuration
         self._step = 0
+        self._compiled = None
 
-    def from_script(path:str) -> 'TuringMachine':
-        """Parse a Turing Machine script that need to be formated like described in the README.md"""
+    def from_script(path:str, tape_type:type=Tape) -> 'TuringMachine':
+        """Parse a Turing Machine script that need to be formated like described in the README.md\n
+        The input word is loaded on a 'Tape' or on an 'ArrayTape' depending of tape_type.
+        """
         BUFFER = {} # key : state name, value : (State, []) the list contains the names of the futurs_states
         with open (path,"r") as fs:
             init_state = parser_tm_script(fs)
@@ -238,7 +822,7 @@ class TuringMachine:
             for final_state in finals:
                 BUFFER[final_state] = (State([],True),[])
             
-            tape = Tape.from_liste(parser_tm_script(fs).split(","))
+            tape = tape_type.from_iterable(read_symbols(parser_tm_script(fs)))
 
             for line in fs:
                 line = line.strip()
@@ -274,8 +858,29 @@ class TuringMachine:
         """Return if the current state if a final state."""
         return self._configuration.current_state.final
 
+    def compile(self) -> CompiledTuringMachine:
+        """Compile the states reachable from the current state into integer lookup tables,
+        'run' and 'run_with_limit' then execute against these tables.\n
+        The TM need to be compiled again if its states or transitions are edited afterwards.
+        """
+        self._compiled = CompiledTuringMachine(self._configuration.current_state)
+        return self._compiled
+
+    def _run_compiled(self, limit:int | None) -> bool:
+        """Run the compiled tables and write the result back in the configuration."""
+        state = self._compiled.state_id(self._configuration.current_state)
+        if state is None: # The configuration was replaced by one outside of the compiled TM
+            state = self.compile().state_id(self._configuration.current_state)
+        tape, state, step, _ = self._compiled.execute(self._configuration.tape, state, self._step, limit)
+        self._configuration.set_tape(tape)
+        self._configuration.set_current_state(self._compiled.states[state])
+        self._step = step
+        return self.check_final()
+
     def run(self) -> bool:
         """Run the Turing Machine while there is transitions."""
+        if self._compiled is not None:
+            return self._run_compiled(None)
         active = True
         while active:
             active = self._configuration.update()
@@ -284,12 +889,60 @@ class TuringMachine:
 
     def run_with_limit(self,limit:int) -> bool:
         """Run the Turing Machine while the limit of step isn't reached."""
+        if self._compiled is not None:
+            return self._run_compiled(limit)
         active = True
         while active and self._step<limit:
             active = self._configuration.update()
             self._step += 1
         return self.check_final()
 
+    def compiled_configuration(self) -> tuple[CompiledTuringMachine,ArrayTape,int,type]:
+        """Return the compiled TM, the tape as an ArrayTape of its alphabet, the id of the current state
+        and the type of the tape of the configuration (compiling the TM if needed).
+
+        A 'Tape' or a 'RunLengthTape' is copied in an ArrayTape, that 'restore_configuration' convert back.
+        """
+        compiled = self._compiled if self._compiled is not None else self.compile()
+        state = compiled.state_id(self._configuration.current_state)
+        if state is None: # The configuration was replaced by one outside of the compiled TM
+            compiled = self.compile()
+            state = compiled.state_id(self._configuration.current_state)
+
+        tape = self._configuration.tape
+        tape_type = type(tape)
+        if tape_type is ArrayTape:
+            tape.rebind(compiled.alphabet)
+        else:
+            symbols, head = tape.snapshot()
+            tape = ArrayTape.from_iterable(symbols, compiled.alphabet, head)
+        return compiled, tape, state, tape_type
+
+    def restore_configuration(self, tape:ArrayTape, state:int, tape_type:type):
+        """Write back in the configuration a tape and a state id obtained with 'compiled_configuration',
+        converted back into tape_type.
+        """
+        if tape_type is Tape:
+            symbols, head = tape.snapshot()
+            tape = Tape.from_iterable(symbols, head)
+        elif tape_type is RunLengthTape:
+            symbols, head = tape.snapshot()
+            tape = RunLengthTape.from_iterable(symbols, tape.alphabet, head)
+        self._configuration.set_tape(tape)
+        self._configuration.set_current_state(self._compiled.states[state])
+
+    def run_with_detection(self, limit:int | None = None, memory:int = 1 << 20) -> bool | Cycle:
+        """Run the compiled Turing Machine while there is transitions and the limit of step isn't reached,
+        but stop as soon as its configurations cycle.\n
+        Return a Cycle object when the TM never halts, and if the current state is final otherwise.
+        """
+        compiled, tape, state, tape_type = self.compiled_configuration()
+        tape, state, self._step, _, cycle = compiled.execute_detect(tape, state, self._step, limit, memory)
+        self.restore_configuration(tape, state, tape_type)
+        if cycle is not None:
+            return cycle
+        return self.check_final()
+
     def __repr__(self):
         return f"TuringMachine -- at step : {self._step}\n{self._configuration}"
     
@@ -297,12 +950,16 @@ class TuringMachine:
         """This function just display the Turing Machine if teh step limit is already reached.\n
         In the other cases, it run and display the turing machine and show each step of the running.
         """
+        import pygame # Imported here so that headless runs don't need pygame
+        from renderer import TapeView, Pacer
+
         pygame.init()
         screen = pygame.display.set_mode((800, 600))
         font = pygame.font.SysFont('Arial', 25)
         clock = pygame.time.Clock()
+        view = TapeView(screen, font)
+        pacer = Pacer(60 / 25) # A step every 25 frames, the arrows change the pace
         running = True
-        compteur = 0
         if self._step - limit == 0:
             running = False
             if self.check_final():
@@ -318,39 +975,21 @@ class TuringMachine:
                 if event.type == pygame.QUIT:
                     running = False
                     result=""
+                pacer.handle(event)
 
             screen.fill("white")
 
-            pygame.draw.rect(screen, (217,167,161), (385, 295, 25, 25))
-            screen.blit(font.render(f"{self.configuration.tape.symbol}", True, (0,0,0)), dest=(390, 295, 20, 20))
+            # Only the cells on the screen are read
+            symbols, head = self.configuration.tape.snapshot(view.radius())
+            view.draw(symbols, head)
             if result!="":
-                screen.blit(font.render(f"{result}", True, (0,0,0)), dest=(350, 345, 60, 60))
-            
-            i=1
-            left = self.configuration.tape.left
-            right = self.configuration.tape.right
-
-            while left!=None or right!=None:
-                left_coord = 385 - 25 * i
-                right_coord = 385 + 25 * i
-
-                if isinstance(left,Tape):
-                    pygame.draw.rect(screen, (0,167,161), (left_coord, 295, 25, 25))
-                    screen.blit(font.render(f"{left.symbol}", True, (0,0,0)), dest=(left_coord, 295, 20, 20))
-                    left = left.left
-
-                if isinstance(right,Tape):
-                    pygame.draw.rect(screen, (0,167,161), (right_coord, 295, 25, 25))
-                    screen.blit(font.render(f"{right.symbol}", True, (0,0,0)), dest=(right_coord, 295, 20, 20))
-                    right = right.right
-
-                i+=1
+                screen.blit(view.glyphs.glyph(result), dest=(350, 345, 60, 60))
 
             pygame.display.flip()
 
-            clock.tick(60)
-            compteur = (compteur + 1)%25
-            if compteur == 0 and running:
+            steps = pacer.steps(clock.tick(60))
+            while steps > 0 and running:
+                steps -= 1
                 if self.configuration.update() == False:
                     running = False
                     if self.check_final():
@@ -362,6 +1001,7 @@ class TuringMachine:
 
     configuration = property(lambda x: x._configuration,set_configuration)
     step = property(lambda x: x._step,set_step)
+    compiled = property(lambda x: x._compiled)
 
 def question_11(tm: TuringMachine, configuration: Configuration, limit: int):
     """This function use the methods and classes to perform the question 11."""
@@ -371,7 +1011,7 @@ def question_11(tm: TuringMachine, configuration: Configuration, limit: int):
 
 def question_12(tm: TuringMachine, word: str):
     """This function use the methods and classes to perform the question 12."""
-    new_tape = Tape.from_liste([char for char in word])
+    new_tape = type(tm.configuration.tape).from_iterable(word)
     tm.configuration.set_tape(new_tape)
     tm.run()
     tm.display()
@@ -383,6 +1023,51 @@ def parser_tm_script(source: TextIOWrapper):
         line = source.readline().strip()
     return line
 
+def read_symbols(source, separator:str=",", chunk_size:int=1 << 16):
+    """This generator yield the symbols of a comma-separated input without materializing them in a list.\n
+    The source can be a str, a text or binary file handle or a memory-mapped file, the last two are read by chunks.
+    The symbols are split like 'str.split' does, only the whitespaces around a whole file are ignored like
+    around the line of the input word of a script.
+    """
+    if isinstance(source, str):
+        start = 0
+        end = source.find(separator)
+        while end != -1:
+            yield source[start:end]
+            start = end + len(separator)
+            end = source.find(separator, start)
+        yield source[start:]
+        return
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    started = False
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, (bytes, bytearray)):
+            chunk = decoder.decode(chunk)
+        pending += chunk
+        if not started:
+            pending = pending.lstrip()
+            started = pending != ""
+        fields = pending.split(separator)
+        pending = fields.pop()
+        yield from fields
+    pending += decoder.decode(b"", final=True)
+    # An empty or blank file doesn't contain any symbol
+    if started:
+        yield pending.rstrip()
+
+def tape_from_file(path:str, tape_type:type=ArrayTape) -> Tape | ArrayTape:
+    """Load a comma-separated input word from a file through a memory mapping."""
+    with open(path, "rb") as fs:
+        if os.fstat(fs.fileno()).st_size == 0:
+            return tape_type.from_iterable(())
+        with mmap.mmap(fs.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return tape_type.from_iterable(read_symbols(mapped))
+
 if __name__ == '__main__':
     args = sys.argv[1:]
     TM: TuringMachine = TuringMachine.from_script("res/binary_add.tur")
@@ -0,0 +1,392 @@
+import glob
+import io
+import itertools
+import os
+import random
+import struct
+import sys
+import tempfile
+import unittest
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from cellular_automata import CellularAutomaton, Config, ArrayConfig, RunLengthConfig, RuleIndex, RuleTable, load_cellular_from_file
+from cellular_parser import CellularParser, cellular_parser
+from compiled_automaton import compile_cellular, load_compiled, load_cellular_cached
+import compiled_automaton
+from recorder import record_cellular_automaton, TraceReader
+from spacetime import palette, diagram_size, export_ppm, export_png
+from timeline import CellularTimeline
+from translate import translate_turing_machine, translate_to_automaton
+from turing_machine import TuringMachine, ArrayTape
+
+RES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'res')
+SCRIPTS = sorted(glob.glob(os.path.join(RES, '*.cel')))
+MACHINES = sorted(glob.glob(os.path.join(RES, '*.tur')))
+CONFIG_TYPES = (ArrayConfig, RunLengthConfig)
+
+def random_automaton(generator: random.Random, stable: bool = False) -> CellularAutomaton:
+    '''
+        Returns an automaton of 1 to 5 states with random rules, the blank background stays blank with `stable`.
+    '''
+    k = generator.randint(1, 5)
+    names = tuple(generator.sample(tuple(f'S{i}' for i in range(k - 1)) + ('Blank',), k))
+    automaton = CellularAutomaton(names, {}, {})
+    for index in itertools.product(names, repeat=3):
+        if stable and index == ('Blank', 'Blank', 'Blank'):
+            continue
+        if generator.random() < 0.6:
+            automaton._rules.set(index, generator.choice(names))
+    return automaton
+
+def random_states(generator: random.Random, automaton: CellularAutomaton) -> list:
+    return [generator.choice(automaton.states) for _ in range(generator.randint(1, 30))]
+
+def reference(automaton: CellularAutomaton, states: list, generations: int) -> list:
+    '''
+        Returns the states after `generations` steps of a linked `Config`.
+    '''
+    return history(automaton, states, generations)[-1][1]
+
+def history(automaton: CellularAutomaton, states: list, generations: int) -> list:
+    '''
+        Returns the position of the leftmost cell and the states of each generation of a linked `Config`.
+    '''
+    config = Config.from_liste(states)
+    left = 0
+    result = [(left, config.states())]
+    for _ in range(generations):
+        if automaton.step(config)[0]:
+            left -= 1
+        result.append((left, config.states()))
+    return result
+
+def random_cases(seed: int, count: int) -> list:
+    generator = random.Random(seed)
+    cases = [load_cellular_from_file(path) for path in SCRIPTS]
+    return cases + [(automaton, Config.from_liste(random_states(generator, automaton)))
+                    for automaton in (random_automaton(generator) for _ in range(count))]
+
+class TestConfigs(unittest.TestCase):
+    def check_step(self, automaton: CellularAutomaton, states: list, generations: int):
+        expected = Config.from_liste(states)
+        configs = [config_type.from_liste(states) for config_type in CONFIG_TYPES]
+        for generation in range(generations):
+            result = automaton.step(expected)
+            for config in configs:
+                self.assertEqual(automaton.step(config), result, (type(config).__name__, generation))
+                self.assertEqual(config.states(), expected.states(), (type(config).__name__, generation))
+                self.assertEqual(len(config), len(expected.states()))
+
+    def test_step_scripts(self):
+        for path in SCRIPTS:
+            automaton, config = load_cellular_from_file(path)
+            self.check_step(automaton, config.states(), 60)
+
+    def test_step_random(self):
+        generator = random.Random(1)
+        for _ in range(150):
+            automaton = random_automaton(generator)
+            self.check_step(automaton, random_states(generator, automaton), 20)
+
+    def test_run(self):
+        generator = random.Random(2)
+        for automaton, config in random_cases(2, 100):
+            generations = generator.randint(0, 40)
+            expected = reference(automaton, config.states(), generations)
+            for config_type in CONFIG_TYPES + (Config,):
+                result = config_type.from_liste(config.states())
+                automaton.run(result, generations)
+                self.assertEqual(result.states(), expected, config_type.__name__)
+            with self.assertRaises(ValueError):
+                automaton.run(config, -1)
+
+    def test_step_many(self):
+        generator = random.Random(3)
+        cases = [load_cellular_from_file(path) for path in SCRIPTS]
+        cases += [(automaton, Config.from_liste(random_states(generator, automaton)))
+                  for automaton in (random_automaton(generator, generator.random() < 0.8) for _ in range(100))]
+        for automaton, config in cases:
+            generations = generator.randint(0, 12)
+            expected = reference(automaton, config.states(), generations)
+            for config_type in CONFIG_TYPES + (Config,):
+                result = config_type.from_liste(config.states())
+                automaton.step_many(result, generations, generator.choice((1, 3, 4096)))
+                self.assertEqual(result.states(), expected, config_type.__name__)
+
+    def test_run_until_stable(self):
+        for path in SCRIPTS:
+            automaton, config = load_cellular_from_file(path)
+            expected = automaton.run_until_stable(Config.from_liste(config.states()), 200)
+            for config_type in CONFIG_TYPES:
+                self.assertEqual(repr(automaton.run_until_stable(config_type.from_liste(config.states()), 200)), repr(expected))
+
+    def test_push_pop(self):
+        generator = random.Random(4)
+        names = ('A', 'B', 'Blank')
+        for _ in range(100):
+            states = [generator.choice(names) for _ in range(generator.randint(1, 10))]
+            configs = [config_type.from_liste(states) for config_type in CONFIG_TYPES + (Config,)]
+            for _ in range(20):
+                operation = generator.choice(('push_front', 'push_back', 'pop_front', 'pop_back'))
+                if operation.startswith('pop') and len(configs[0]) == 1:
+                    continue
+                state = generator.choice(names)
+                next_state = generator.choice(((), (generator.choice(names),)))
+                for config in configs:
+                    if operation.startswith('push'):
+                        getattr(config, operation)(state, *next_state)
+                    else:
+                        getattr(config, operation)()
+                self.assertEqual(configs[0].states(), configs[2].states())
+                self.assertEqual(configs[1].states(), configs[2].states())
+                self.assertEqual(configs[0].states(1, 4), configs[2].states(1, 4))
+            for config in configs:
+                with self.assertRaises(ValueError):
+                    config.push_back('A', 1)
+
+class TestRuleIndex(unittest.TestCase):
+    def test_patterns(self):
+        generator = random.Random(5)
+        names = ('A', 'B', 'C', 'Blank')
+        for _ in range(100):
+            rules = RuleIndex(names, 3)
+            rules.add_class('AB', ('A', 'B'))
+            values = ('A', 'B', 'C', 'Blank', 'AB', '?')
+            entries = [(tuple(generator.choice(values) for _ in range(3)), generator.choice(names)) for _ in range(12)]
+            for index, value in entries:
+                rules.set(index, value)
+
+            # Brute force : an exact rule, or the matching pattern with the fewest indices, the last one set on ties
+            def matches(pattern, index) -> bool:
+                return all(p == i or p == '?' or (p == 'AB' and i in ('A', 'B')) for p, i in zip(pattern, index))
+            def weight(pattern) -> int:
+                weight = 1
+                for p in pattern:
+                    weight *= 4 if p == '?' else 2 if p == 'AB' else 1
+                return weight
+            final = {}
+            for index, value in entries:
+                # Set again, a pattern moves last
+                final.pop(index, None)
+                final[index] = value
+            for index in itertools.product(names, repeat=3):
+                expected = final.get(index)
+                if expected == None:
+                    candidates = [(weight(p), -order, v) for order, (p, v) in enumerate(final.items()) if matches(p, index)]
+                    if candidates:
+                        expected = min(candidates)[2]
+                self.assertEqual(rules.get(index), expected, index)
+
+    def test_lazy_table(self):
+        generator = random.Random(6)
+        limit = RuleIndex.DENSE_LIMIT
+        try:
+            RuleIndex.DENSE_LIMIT = 0
+            for _ in range(50):
+                automaton = random_automaton(generator)
+                states = random_states(generator, automaton)
+                self.assertIsInstance(automaton._rules.table(), RuleTable)
+                expected = reference(automaton, states, 15)
+                for config_type in CONFIG_TYPES:
+                    config = config_type.from_liste(states)
+                    for _ in range(15):
+                        automaton.step(config)
+                    self.assertEqual(config.states(), expected)
+        finally:
+            RuleIndex.DENSE_LIMIT = limit
+
+class TestFormats(unittest.TestCase):
+    def test_streaming_parser(self):
+        for path in SCRIPTS:
+            with open(path) as stream:
+                source = stream.read()
+            expected = cellular_parser(source)
+            for chunk_size in (1, 7, 1 << 20):
+                self.assertEqual(CellularParser(stream=io.StringIO(source), chunk_size=chunk_size).parse(), expected)
+
+        generator = random.Random(7)
+        tokens = [':', '\n', ' ', ',', '(', ')', '<-', '->', '-', 'A', '12', '?', '(A, B, C) -> D']
+        for path in SCRIPTS:
+            with open(path) as stream:
+                source = list(stream.read())
+            for _ in range(50):
+                broken = list(source)
+                broken.insert(generator.randrange(len(broken) + 1), generator.choice(tokens))
+                broken = ''.join(broken)
+                results = []
+                for parse in (lambda: cellular_parser(broken), lambda: CellularParser(stream=io.StringIO(broken), chunk_size=5).parse()):
+                    try:
+                        results.append(parse())
+                    except ValueError as error:
+                        results.append(str(error))
+                self.assertEqual(results[0], results[1], broken)
+
+    def test_streamed_loading(self):
+        for path in SCRIPTS:
+            automaton, config = load_cellular_from_file(path)
+            streamed, streamed_config = load_cellular_from_file(path, ArrayConfig, chunk_size=16)
+            self.assertEqual(list(streamed._rules.items()), list(automaton._rules.items()))
+            self.assertEqual(streamed_config.states(), config.states())
+
+    def test_compiled(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # The translated automata declare a class and patterns
+            translated = []
+            for path in MACHINES:
+                translated.append(os.path.join(directory, f'{len(translated)}.cel'))
+                translate_turing_machine(path, translated[-1])
+            limit = compiled_automaton.DENSE_LIMIT
+            for path, dense_limit in itertools.product(SCRIPTS + translated, (limit, 0)):
+                automaton, config = load_cellular_from_file(path)
+                compiled_path = os.path.join(directory, 'automaton.celc')
+                try:
+                    compiled_automaton.DENSE_LIMIT = dense_limit
+                    compile_cellular(path, compiled_path)
+                finally:
+                    compiled_automaton.DENSE_LIMIT = limit
+                for config_type in CONFIG_TYPES + (Config,):
+                    loaded, loaded_config = load_compiled(compiled_path, config_type, path)
+                    self.assertEqual(loaded.states, automaton.states)
+                    self.assertEqual(loaded._colors, automaton._colors)
+                    self.assertEqual(loaded_config.states(), config.states())
+                    self.assertEqual(dict(loaded._rules.items()), dict(automaton._rules.items()))
+                    self.assertEqual(list(loaded._rules._patterns), list(automaton._rules._patterns))
+                    self.assertEqual(loaded._rules.expanded(), automaton._rules.expanded())
+                    for index in itertools.product(automaton.states, repeat=3):
+                        self.assertEqual(loaded._rules.get(index), automaton._rules.get(index))
+                    expected = reference(automaton, config.states(), 30)
+                    for _ in range(30):
+                        loaded.step(loaded_config)
+                    self.assertEqual(loaded_config.states(), expected)
+                    self.assertEqual(list(loaded._rules.dense()), automaton._rules.dense())
+
+            source = os.path.join(directory, 'source.cel')
+            with open(SCRIPTS[0]) as stream, open(source, 'w') as copy:
+                copy.write(stream.read())
+            load_cellular_cached(source)
+            with open(source, 'a') as copy:
+                copy.write('\n')
+            with self.assertRaises(ValueError):
+                load_compiled(os.path.splitext(source)[0] + '.celc', source_path=source)
+            self.assertEqual(load_cellular_cached(source)[1].states(), load_cellular_from_file(source)[1].states())
+
+    def test_timeline(self):
+        generator = random.Random(8)
+        for automaton, config in random_cases(8, 100):
+            expected = history(automaton, config.states(), 80)
+            timeline = CellularTimeline(automaton, config, generator.choice((1, 7, 256)))
+            for _ in range(10):
+                if generator.random() < 0.3:
+                    position = timeline.step_back()
+                else:
+                    position = timeline.seek(generator.randint(0, 80))
+                self.assertEqual((timeline.left, timeline.row), expected[position])
+                self.assertEqual(timeline.config().states(), expected[position][1])
+
+    def test_recorder(self):
+        generator = random.Random(9)
+        with tempfile.TemporaryDirectory() as directory:
+            trace = os.path.join(directory, 'trace.bin')
+            for automaton, config in random_cases(9, 100):
+                expected = history(automaton, config.states(), 40)
+                record_cellular_automaton(automaton, Config.from_liste(config.states()), trace, 40, 64)
+                with TraceReader(trace) as reader:
+                    for generation in sorted(generator.randint(0, 40) for _ in range(5)):
+                        left, states = expected[generation]
+                        low, row = reader.row_at(generation)
+                        # The replayed row spans every cell written so far, the blanks left behind included
+                        self.assertEqual(row[left - low:left - low + len(states)], states)
+                        self.assertTrue(all(state == 'Blank' for state in row[:left - low] + row[left - low + len(states):]))
+
+    def test_spacetime(self):
+        generator = random.Random(10)
+        with tempfile.TemporaryDirectory() as directory:
+            for automaton, config in random_cases(10, 30):
+                generations = generator.randint(0, 30)
+                expected = history(automaton, config.states(), generations)
+                low = min(left for left, _ in expected)
+                width = max(left + len(states) for left, states in expected) - low
+                self.assertEqual(diagram_size(automaton, config, generations), (generations + 1, width, low))
+
+                colors = palette(automaton)
+                rows = [colors['Blank'] * (left - low) + b''.join(colors[state] for state in states) + colors['Blank'] * (width - left + low - len(states))
+                        for left, states in expected]
+                path = os.path.join(directory, 'diagram.ppm')
+                export_ppm(automaton, config, generations, path)
+                with open(path, 'rb') as stream:
+                    self.assertEqual(stream.read(), f'P6\n{width} {generations + 1}\n255\n'.encode() + b''.join(rows))
+
+                path = os.path.join(directory, 'diagram.png')
+                export_png(automaton, config, generations, path)
+                with open(path, 'rb') as stream:
+                    data = stream.read()
+                chunks, offset = {}, 8
+                while offset < len(data):
+                    size, kind = struct.unpack_from('>I4s', data, offset)
+                    chunk = data[offset + 8:offset + 8 + size]
+                    self.assertEqual(struct.unpack_from('>I', data, offset + 8 + size)[0], zlib.crc32(chunk, zlib.crc32(kind)))
+                    chunks[kind] = chunks.get(kind, b'') + chunk
+                    offset += 12 + size
+                self.assertEqual(struct.unpack('>II', chunks[b'IHDR'][:8]), (width, generations + 1))
+                self.assertEqual(zlib.decompress(chunks[b'IDAT']), b''.join(b'\0' + row for row in rows))
+
+class TestTranslation(unittest.TestCase):
+    def test_written_and_in_memory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for path in MACHINES:
+                written = os.path.join(directory, 'translated.cel')
+                translate_turing_machine(path, written)
+                automaton, config = load_cellular_from_file(written)
+                in_memory, in_memory_config = translate_to_automaton(path)
+                self.assertEqual(automaton.states, in_memory.states)
+                self.assertEqual(list(automaton._rules.items()), list(in_memory._rules.items()))
+                self.assertEqual(config.states(), in_memory_config.states())
+
+    def test_tape_class_collision(self):
+        # A state of the automaton is a state of the Turing Machine followed by a symbol
+        cases = [
+            ('q0\nqAccept\np\n\nq0,p,Tap,e,>\nTap,_,qAccept,_,-\n', 'Tap', 'e'),
+            ('q0\nqAccept\n0\n\nq0,0,Ta,pe,-\n', 'Ta', 'pe'),
+            ('q0\nTap\n0\n\nq0,0,q1,e,>\n', 'Tap', 'e'),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'machine.tur')
+            for source, state, symbol in cases:
+                with open(path, 'w') as stream:
+                    stream.write(source)
+                with self.assertRaisesRegex(ValueError, f"state '{state}' and the symbol '{symbol}'"):
+                    translate_to_automaton(path)
+
+    def test_simulates_the_turing_machine(self):
+        for path in MACHINES:
+            automaton, config = translate_to_automaton(path, ArrayConfig)
+            tm = TuringMachine.from_script(path, ArrayTape)
+            compiled, tape, state, _ = tm.compiled_configuration()
+            halted = False
+            # A generation of the automaton is a step of the Turing Machine
+            for _ in range(300):
+                cells = ['_' if cell == 'Blank' else cell[-1] for cell in config.states()]
+                heads = [index for index, cell in enumerate(config.states()) if cell[0] != '*' and cell != 'Blank']
+                self.assertEqual(len(heads), 1)
+                symbols, head = tape.snapshot()
+                self.assertEqual(trimmed(cells, heads[0]), trimmed(symbols, head))
+                if halted:
+                    break
+                tape, state, _, halted = compiled.execute(tape, state, 0, 1)
+                automaton.step(config)
+
+def trimmed(symbols: list, head: int) -> tuple[list, int]:
+    '''
+        Returns the symbols without the blanks at both ends, and the head relatively to the first one kept.
+    '''
+    low, high = 0, len(symbols)
+    while low < head and symbols[low] == '_':
+        low += 1
+    while high > head + 1 and symbols[high - 1] == '_':
+        high -= 1
+    return symbols[low:high], head - low
+
+if __name__ == '__main__':
+    unittest.main()
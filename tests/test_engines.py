@@ -0,0 +1,139 @@
+import glob
+import importlib.util
+import itertools
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from cellular_automata import CellularAutomaton, Config, ArrayConfig, RunLengthConfig, RuleIndex, RuleTable, load_cellular_from_file
+from active_window import ActiveEngine
+from bitslice import BitSliceEngine
+from hashlife import HashlifeEngine
+from parallel_engine import ParallelEngine
+from translate import translate_to_automaton
+
+RES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'res')
+SCRIPTS = sorted(glob.glob(os.path.join(RES, '*.cel')))
+MACHINES = sorted(glob.glob(os.path.join(RES, '*.tur')))
+
+def random_automaton(generator: random.Random, stable: bool = False) -> CellularAutomaton:
+    '''
+        Returns an automaton of 1 to 5 states with random rules, the blank background stays blank with `stable`.
+    '''
+    k = generator.randint(1, 5)
+    names = tuple(generator.sample(tuple(f'S{i}' for i in range(k - 1)) + ('Blank',), k))
+    automaton = CellularAutomaton(names, {}, {})
+    for index in itertools.product(names, repeat=3):
+        if stable and index == ('Blank', 'Blank', 'Blank'):
+            continue
+        if generator.random() < 0.6:
+            automaton._rules.set(index, generator.choice(names))
+    return automaton
+
+def cases(seed: int, count: int, stable: bool = False) -> list:
+    '''
+        Returns the automata and configurations of the scripts of res/ and of `count` random automata.
+    '''
+    generator = random.Random(seed)
+    result = [load_cellular_from_file(path) for path in SCRIPTS]
+    if stable:
+        result = [(automaton, config) for automaton, config in result if automaton.blank_is_stable()]
+    for _ in range(count):
+        automaton = random_automaton(generator, stable)
+        result.append((automaton, Config.from_liste([generator.choice(automaton.states) for _ in range(generator.randint(1, 30))])))
+    return result
+
+def reference(automaton: CellularAutomaton, states: list, generations: int) -> tuple[list, int]:
+    '''
+        Returns the states after `generations` steps of a linked `Config`, and the position of its leftmost cell.
+    '''
+    config = Config.from_liste(states)
+    left = 0
+    for _ in range(generations):
+        if automaton.step(config)[0]:
+            left -= 1
+    return config.states(), left
+
+class TestEngines(unittest.TestCase):
+    def check_engine(self, engine_type: type, seed: int, count: int, max_generations: int = 60):
+        generator = random.Random(seed)
+        for automaton, config in cases(seed, count):
+            if len(automaton.states) > getattr(engine_type, 'MAX_STATES', len(automaton.states)):
+                continue
+            engine = engine_type(automaton)
+            generations = generator.randint(0, max_generations)
+            expected = reference(automaton, config.states(), generations)[0]
+            for config_type in (Config, ArrayConfig, RunLengthConfig):
+                result = engine.run(config_type.from_liste(config.states()), generations)
+                self.assertIsInstance(result, config_type)
+                self.assertEqual(result.states(), expected, (engine_type.__name__, config_type.__name__))
+            with self.assertRaises(ValueError):
+                engine.run(config, -1)
+
+    def test_bitslice(self):
+        self.check_engine(BitSliceEngine, 1, 150)
+
+    @unittest.skipIf(importlib.util.find_spec('numpy') == None, 'numpy is not installed')
+    def test_numpy(self):
+        from numpy_engine import NumpyEngine
+        self.check_engine(NumpyEngine, 2, 150)
+        generator = random.Random(2)
+        for automaton, _ in cases(2, 50):
+            if generator.random() < 0.5:
+                automaton._rules.set(('?', generator.choice(automaton.states), '?'), generator.choice(automaton.states))
+            self.assertEqual(NumpyEngine(automaton)._table.reshape(-1).tolist(), automaton._rules.dense())
+
+    def test_parallel(self):
+        self.check_engine(lambda automaton: ParallelEngine(automaton, 2), 3, 3, 30)
+        # The dense table sent to the workers stays within the limit of `RuleIndex.table`
+        states = round(RuleIndex.DENSE_LIMIT ** (1 / 3)) + 1
+        with self.assertRaises(ValueError):
+            ParallelEngine(CellularAutomaton(tuple(f'S{i}' for i in range(states - 1)) + ('Blank',), {}, {}), 2)
+
+    def test_active(self):
+        generator = random.Random(4)
+        translated = [translate_to_automaton(path) for path in MACHINES]
+        for automaton, config in cases(4, 150) + translated:
+            engine = ActiveEngine(automaton, config)
+            done = 0
+            for generations in sorted(generator.randint(0, 60) for _ in range(3)):
+                engine.run(generations - done)
+                done = generations
+                expected, left = reference(automaton, config.states(), generations)
+                self.assertEqual(engine.config().states(), expected)
+                self.assertEqual(engine.left, left)
+                self.assertEqual(engine.generation, generations)
+
+    def check_hashlife(self, seed: int, count: int):
+        generator = random.Random(seed)
+        for automaton, config in cases(seed, count, True):
+            for max_cache in (4, 1 << 20):
+                engine = HashlifeEngine(automaton, max_cache)
+                generations = generator.randint(0, 200)
+                states, left = reference(automaton, config.states(), generations)
+                # The tape returned is trimmed to its non-blank cells
+                kept = [index for index, state in enumerate(states) if state != 'Blank']
+                result, position = engine.advance(config, generations)
+                if kept:
+                    self.assertEqual(result.states(), states[kept[0]:kept[-1] + 1])
+                    self.assertEqual(position, left + kept[0])
+                else:
+                    self.assertEqual(result.states(), ['Blank'])
+
+    def test_hashlife(self):
+        self.check_hashlife(5, 150)
+
+    def test_hashlife_lazy_table(self):
+        limit = RuleIndex.DENSE_LIMIT
+        try:
+            RuleIndex.DENSE_LIMIT = 0
+            self.assertIsInstance(HashlifeEngine(cases(6, 1, True)[-1][0])._table, RuleTable)
+            self.check_hashlife(6, 30)
+        finally:
+            RuleIndex.DENSE_LIMIT = limit
+
+if __name__ == '__main__':
+    unittest.main()
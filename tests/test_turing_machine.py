@@ -0,0 +1,237 @@
+import glob
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from turing_machine import TuringMachine, Tape, ArrayTape, RunLengthTape, Symbol, Cycle, read_symbols, ACCEPT, REJECT, TIMEOUT, CYCLE
+from macro_machine import MacroMachine
+from batch import run_word, run_batch
+from timeline import TuringTimeline
+from recorder import record_turing_machine, TraceReader
+
+RES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'res')
+MACHINES = sorted(glob.glob(os.path.join(RES, '*.tur')))
+
+# Goes back and forth between two cells forever
+LOOPING = '''q0
+qAccept
+0
+
+q0,0,q1,0,>
+q1,_,q0,_,<
+'''
+
+def load(source_path: str, tape_type: type) -> TuringMachine:
+    return TuringMachine.from_script(source_path, tape_type)
+
+def random_script(generator: random.Random, word: str | None = None) -> str:
+    """Return the source of a TM of 1 to 5 states on the symbols 0, 1 and _ with random transitions."""
+    states = [f"q{i}" for i in range(generator.randint(1, 5))]
+    finals = [state for state in states + ["qAccept", "qReject"] if generator.random() < 0.3] or ["qAccept"]
+    if word is None:
+        word = ",".join(generator.choice("01_") for _ in range(generator.randint(1, 8)))
+    lines = [states[0], ",".join(finals), word, ""]
+    for state in states:
+        for read in "01_":
+            # The initial state needs a transition to be declared
+            if generator.random() < 0.85 or (state == states[0] and read == "_" and len(lines) == 4):
+                futur_state = generator.choice(states + ["qAccept", "qReject"])
+                lines.append(f"{state},{read},{futur_state},{generator.choice('01_')},{generator.choice('<>-')}")
+    return "\n".join(lines) + "\n"
+
+def write_script(directory: str, source: str) -> str:
+    path = os.path.join(directory, "machine.tur")
+    with open(path, "w") as stream:
+        stream.write(source)
+    return path
+
+def reference(tm: TuringMachine, limit: int) -> bool:
+    """Run the TM with 'Configuration.update' like 'TuringMachine.run_with_limit' and return if it halted."""
+    while tm.step < limit:
+        tm.set_step(tm.step + 1)
+        if not tm.configuration.update():
+            return True
+    return False
+
+def trimmed(symbols: list, head: int) -> tuple[list, int]:
+    """Return the symbols without the blanks at both ends, and the head relatively to the first one kept."""
+    low, high = 0, len(symbols)
+    while low < head and symbols[low] == "_":
+        low += 1
+    while high > head + 1 and symbols[high - 1] == "_":
+        high -= 1
+    return symbols[low:high], head - low
+
+def cases(directory: str, seed: int, count: int):
+    """Yield the path of the scripts of res/ then of 'count' random scripts written in 'directory'."""
+    yield from MACHINES
+    generator = random.Random(seed)
+    for _ in range(count):
+        yield write_script(directory, random_script(generator))
+
+class TestRunLengthTape(unittest.TestCase):
+    def test_run_with_detection(self):
+        expected = load(os.path.join(RES, 'palindrome.tur'), ArrayTape)
+        tm = load(os.path.join(RES, 'palindrome.tur'), RunLengthTape)
+        self.assertEqual(tm.run_with_detection(), expected.run())
+        self.assertIsInstance(tm.configuration.tape, RunLengthTape)
+        self.assertEqual(tm.configuration.tape.snapshot(), expected.configuration.tape.snapshot())
+        self.assertEqual(tm.step, expected.step)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'looping.tur')
+            with open(path, 'w') as stream:
+                stream.write(LOOPING)
+            tm = load(path, RunLengthTape)
+            self.assertIsInstance(tm.run_with_detection(1000), Cycle)
+            self.assertIsInstance(tm.configuration.tape, RunLengthTape)
+
+    def test_macro_machine(self):
+        expected = load(os.path.join(RES, 'palindrome.tur'), ArrayTape)
+        tm = load(os.path.join(RES, 'palindrome.tur'), RunLengthTape)
+        self.assertEqual(MacroMachine(tm, 4).run(), MacroMachine(expected, 4).run())
+        self.assertIsInstance(tm.configuration.tape, RunLengthTape)
+        self.assertEqual(tm.configuration.tape.snapshot(), expected.configuration.tape.snapshot())
+        self.assertEqual(tm.step, expected.step)
+
+    def test_snapshot_radius(self):
+        generator = random.Random(0)
+        for _ in range(200):
+            symbols = [generator.choice('_ab') for _ in range(generator.randint(1, 30))]
+            head = generator.randrange(len(symbols))
+            runs = RunLengthTape.from_iterable(symbols, None, head)
+            cells = ArrayTape.from_iterable(symbols, None, head)
+            for _ in range(generator.randint(0, 20)):
+                operation = generator.choice(('left', 'right', 'write'))
+                if operation == 'left':
+                    runs.move_left()
+                    cells.move_left()
+                elif operation == 'right':
+                    runs.move_right()
+                    cells.move_right()
+                else:
+                    symbol = Symbol(generator.choice('_ab'))
+                    runs.set_symbol(symbol)
+                    cells.set_symbol(symbol)
+            self.assertEqual(runs.snapshot(), cells.snapshot())
+            for radius in range(35):
+                self.assertEqual(runs.snapshot(radius), cells.snapshot(radius))
+
+class TestReadSymbols(unittest.TestCase):
+    def test_split(self):
+        generator = random.Random(6)
+        for _ in range(300):
+            source = "".join(generator.choice(["a", "b", ",", " ", "\n", "é"]) for _ in range(generator.randint(0, 20)))
+            # A word is split like the line of a script, the spaces inside the symbols are kept
+            self.assertEqual(list(read_symbols(source)), source.split(","))
+            expected = source.strip().split(",") if source.strip() != "" else []
+            for chunk_size in (1, 3, 1 << 16):
+                self.assertEqual(list(read_symbols(io.StringIO(source), chunk_size=chunk_size)), expected)
+                self.assertEqual(list(read_symbols(io.BytesIO(source.encode()), chunk_size=chunk_size)), expected)
+
+class TestCompiled(unittest.TestCase):
+    def test_execute(self):
+        generator = random.Random(1)
+        with tempfile.TemporaryDirectory() as directory:
+            for path in cases(directory, 1, 400):
+                limit = generator.randint(0, 300)
+                expected = load(path, Tape)
+                halted = reference(expected, limit)
+                for tape_type in (Tape, ArrayTape, RunLengthTape):
+                    tm = load(path, tape_type)
+                    compiled = tm.compile()
+                    tape, state, step, result = compiled.execute(tm.configuration.tape, 0, 0, limit)
+                    self.assertIsInstance(tape, tape_type)
+                    self.assertEqual((step, result), (expected.step, halted), tape_type.__name__)
+                    self.assertEqual(compiled.finals[state], expected.check_final())
+                    self.assertEqual(trimmed(*tape.snapshot()), trimmed(*expected.configuration.tape.snapshot()))
+
+    def test_batch(self):
+        generator = random.Random(2)
+        with tempfile.TemporaryDirectory() as directory:
+            for _ in range(100):
+                source = random_script(generator, "0")
+                compiled = load(write_script(directory, source), ArrayTape).compile()
+                words = ["".join(generator.choice("01_") for _ in range(generator.randint(1, 8))) for _ in range(5)]
+                limit = generator.randint(1, 200)
+                records = []
+                for word in words:
+                    expected = load(write_script(directory, source.replace("\n0\n", f"\n{','.join(word)}\n", 1)), Tape)
+                    halted = reference(expected, limit)
+                    outcome = TIMEOUT if not halted else ACCEPT if expected.check_final() else REJECT
+                    record = run_word(compiled, word, limit)
+                    self.assertEqual(record, (word, outcome, expected.step))
+                    detected = run_word(compiled, word, limit, True)
+                    if detected[1] == CYCLE:
+                        self.assertEqual(outcome, TIMEOUT)
+                    else:
+                        self.assertEqual(detected, record)
+                    records.append(record)
+                self.assertEqual(list(run_batch(compiled, words, limit, 1)), records)
+
+            compiled = load(write_script(directory, LOOPING), ArrayTape).compile()
+            self.assertEqual(run_word(compiled, "0", 1000, True)[1], CYCLE)
+            self.assertEqual(list(run_batch(compiled, ["0", "1", "00"], 1000, 2, 1, detect=True)), [run_word(compiled, word, 1000, True) for word in ["0", "1", "00"]])
+
+    def test_macro_machine(self):
+        generator = random.Random(3)
+        with tempfile.TemporaryDirectory() as directory:
+            for path in cases(directory, 3, 200):
+                limit = generator.randint(0, 300)
+                expected = load(path, ArrayTape)
+                compiled = expected.compile()
+                expected_tape, expected_state, expected_step, expected_halted = compiled.execute(expected.configuration.tape, 0, 0, limit)
+                for block_size in (1, 3, 8):
+                    tm = load(path, ArrayTape)
+                    macro = MacroMachine(tm, block_size, generator.choice((2, 1 << 20)))
+                    tape, state, step, halted = macro.execute(tm.configuration.tape, 0, 0, limit)
+                    self.assertEqual((state, step, halted), (expected_state, expected_step, expected_halted), block_size)
+                    # The visited extent of the tape is the one of 'execute'
+                    self.assertEqual(tape.snapshot(), expected_tape.snapshot(), block_size)
+
+    def test_timeline(self):
+        generator = random.Random(4)
+        with tempfile.TemporaryDirectory() as directory:
+            for path in cases(directory, 4, 100):
+                timeline = TuringTimeline(load(path, ArrayTape), generator.choice((1, 5, 64)))
+                compiled = timeline._compiled
+                for _ in range(10):
+                    if generator.random() < 0.3:
+                        position = timeline.step_back()
+                    else:
+                        target = generator.randint(0, 100)
+                        position = timeline.seek(target)
+                        # Only a halted run stops before the target
+                        self.assertTrue(position == target or timeline.halted)
+                    tape, state, step, _ = compiled.execute(load(path, ArrayTape).configuration.tape, 0, 0, position)
+                    self.assertEqual(step, position)
+                    symbols, head, current_state = timeline.configuration()
+                    self.assertIs(current_state, compiled.states[state])
+                    self.assertEqual(trimmed(symbols, head), trimmed(*tape.snapshot()))
+
+    def test_recorder(self):
+        generator = random.Random(5)
+        with tempfile.TemporaryDirectory() as directory:
+            trace = os.path.join(directory, "trace.bin")
+            for path in cases(directory, 5, 100):
+                limit = generator.randint(0, 200)
+                tm = load(path, ArrayTape)
+                final = record_turing_machine(tm, trace, limit, 64)
+                expected = load(path, ArrayTape)
+                self.assertEqual(final, expected.run_with_limit(limit))
+                self.assertEqual(tm.step, expected.step)
+                with TraceReader(trace) as reader:
+                    for step in sorted(generator.randint(0, tm.step) for _ in range(5)):
+                        compiled = load(path, ArrayTape).compile()
+                        tape, state, _, _ = compiled.execute(load(path, ArrayTape).configuration.tape, 0, 0, step)
+                        symbols, head, recorded_state = reader.tape_at(step)
+                        self.assertEqual(recorded_state, state)
+                        self.assertEqual(trimmed(symbols, head), trimmed(*tape.snapshot()))
+
+if __name__ == '__main__':
+    unittest.main()